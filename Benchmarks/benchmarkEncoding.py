@@ -0,0 +1,59 @@
+import os
+import sys
+import glob
+import time
+import logging
+import tracemalloc
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder
+sys.path.append(os.path.abspath("./Utilities"))
+from categoricalEncoder import CategoricalEncoder
+from pipelineLogging import setup_logging
+
+# Logging configuration
+date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+setup_logging("benchmarkEncoding", log_file=f'logs/benchmarkEncoding_{date_time}.log')
+
+
+def output_bytes(output):
+    if isinstance(output, pd.DataFrame):
+        return int(output.memory_usage(deep=True).sum())
+    if hasattr(output, "indptr"):
+        return output.data.nbytes + output.indices.nbytes + output.indptr.nbytes
+    return output.nbytes
+
+
+def measure(name, encode, dataset):
+    start = time.perf_counter()
+    output = encode(dataset)
+    elapsed = time.perf_counter() - start
+    # Memory is traced in a separate run because tracemalloc slows allocation-heavy code
+    tracemalloc.start()
+    encode(dataset)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"method": name, "seconds": elapsed, "peak_bytes": peak, "output_bytes": output_bytes(output), "columns": output.shape[1]}
+
+
+def benchmark_encoding(dataset):
+    cat_cols = dataset.select_dtypes(include=["object", "category"]).columns.tolist()
+    return [
+        measure("get_dummies (before)", lambda df: pd.get_dummies(df, columns=cat_cols, drop_first=True), dataset),
+        measure("OneHotEncoder with ids (before)", lambda df: OneHotEncoder(handle_unknown="ignore").fit_transform(df[cat_cols].astype(str)), dataset),
+        measure("CategoricalEncoder sparse (after)", lambda df: CategoricalEncoder().fit_transform(df), dataset),
+    ]
+
+
+if __name__ == "__main__":
+    directory_path = sys.argv[1] if len(sys.argv) > 1 else "Staging/OUT"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    all_files = glob.glob(os.path.join(directory_path, "*.csv"))
+    if not all_files:
+        print(f"No CSV files found in {directory_path}")
+    else:
+        dataset = pd.concat([pd.read_csv(file) for file in all_files] * repeats, ignore_index=True)
+        print(f"{len(dataset)} rows from {directory_path}")
+        for result in benchmark_encoding(dataset):
+            print(f"{result['method']:<36} {result['seconds']:>8.3f}s  peak={result['peak_bytes'] / 2**20:>9.1f} MiB  "
+                  f"output={result['output_bytes'] / 2**20:>9.1f} MiB  columns={result['columns']}")
+            logging.info("Encoding benchmark: %s", result)
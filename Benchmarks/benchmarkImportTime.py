@@ -0,0 +1,143 @@
+import os
+import re
+import ast
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+sys.path.append(os.path.abspath("./Benchmarks"))
+from benchmarkPipeline import prepare_workspace, synthetic_file, stand_in_feature_store
+
+# Import-time budget per stage in milliseconds, measured on top of a bare interpreter start.
+# pandas alone costs roughly 400ms, so pandas-only stages get 800ms of headroom; the model
+# stage trains with sklearn, and feast on its own is most of the feature store's budget.
+budgets_ms = {
+    "dataIngestion": 800,
+    "rawDataStorage": 800,
+    "dataValidation": 800,
+    "dataPreparation": 800,
+    "dataTransformation": 800,
+    "featureStore": 3000,
+    "model": 2000,
+}
+stage_scripts = {
+    "dataIngestion": "DataIngestion/dataIngestionApiInputFile.py",
+    "rawDataStorage": "RawDataStorage/rawDataStorage.py",
+    "dataValidation": "DataValidation/dataValidation.py",
+    "dataPreparation": "DataPreparation/DataPreparation.py",
+    "dataTransformation": "DataTransformation/dataTransformation.py",
+    "featureStore": "FeatureStore/Feature_Store.py",
+    "model": "Model/model.py",
+}
+# These two only move data between Kaggle, Postgres and Staging/IN, so they are not run;
+# every import statement in the script counts, wherever it is, since their run reaches all of them
+imports_only = ["dataIngestion", "rawDataStorage"]
+importtime_line = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def all_imports(script):
+    """Returns the sys.path setup and every import statement of a stage script, at any depth, as source code."""
+    with open(script) as f:
+        source = f.read()
+    tree = ast.parse(source)
+    nodes = [node for node in tree.body if isinstance(node, ast.Expr) and "sys.path" in ast.get_source_segment(source, node)]
+    nodes += [node for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.get_source_segment(source, node) for node in sorted(nodes, key=lambda node: node.lineno))
+
+
+def importtime(args, cwd=None, env=None):
+    """Runs python -X importtime with args; returns {top-level module: cumulative us} and the error, if it failed."""
+    # A stage run can write far more than a pipe buffer of import lines, so stderr goes to a file
+    with tempfile.TemporaryFile(mode="w+") as stderr_file:
+        result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=stderr_file, text=True)
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+    modules = {}
+    other_lines = []
+    for line in stderr.splitlines():
+        match = importtime_line.match(line)
+        # Only top-level entries; nested ones are already included in their parent's cumulative time.
+        # Imports inside functions show up at the top level when the function first runs.
+        if match and len(match.group(3)) == 1:
+            modules[match.group(4)] = modules.get(match.group(4), 0) + int(match.group(2))
+        elif not line.startswith("import time:"):
+            other_lines.append(line)
+    error = other_lines[-1] if result.returncode and other_lines else None
+    return modules, error
+
+
+def stage_runs(workspace, rows, seed):
+    """Runs the file-based stages once, in DAG order, on synthetic data in a scratch copy of the repo.
+
+    Each stage runs end to end with SKIP_EDA=1 and a warehouse table that does not exist, so the
+    insert fails without touching real data. Returns {stage: (modules, error)}.
+    """
+    prepare_workspace(workspace)
+    csv_path = synthetic_file(rows, seed)
+    shutil.copy(csv_path, os.path.join(workspace, "Staging/IN", os.path.basename(csv_path)))
+    env = dict(os.environ, PIPELINE_RUN_ID="import_check", SKIP_EDA="1", CHUNK_SIZE="0", DW_TABLENAME="import_check_missing_table")
+    results = {}
+    for stage, script in stage_scripts.items():
+        if stage in imports_only:
+            continue
+        results[stage] = importtime([script], cwd=workspace, env=env)
+        if stage == "featureStore" and importlib.util.find_spec("feast") is None:
+            # Without feast the stage stops early; give the model stage its input the way benchmarkPipeline does
+            stand_in_feature_store(workspace)
+    return results
+
+
+def measure_stages(baseline_modules, workspace, rows, seed, repeats=3):
+    """Best-of-repeats import time per stage, in ms, with its heaviest modules and any run error."""
+    samples = {}
+    for _ in range(repeats):
+        runs = stage_runs(workspace, rows, seed)
+        for stage in imports_only:
+            runs[stage] = importtime(["-c", all_imports(stage_scripts[stage])])
+        for stage, (modules, error) in runs.items():
+            counted = {name: us for name, us in modules.items() if name not in baseline_modules}
+            samples.setdefault(stage, []).append((sum(counted.values()), counted, error))
+    results = {}
+    for stage in stage_scripts:
+        total_us, counted, error = min(samples[stage], key=lambda sample: sample[0])
+        heaviest = sorted(((us, name) for name, us in counted.items()), reverse=True)[:5]
+        results[stage] = (total_us / 1000, heaviest, error)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check each stage's import time, including imports made while it runs, against its budget")
+    parser.add_argument("--rows", type=int, default=2000, help="synthetic rows the stages run on")
+    parser.add_argument("--seed", type=int, default=106)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workspace", default="Benchmarks/importtime_workspace")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    baseline_modules, _ = importtime(["-c", "pass"])
+    measured = measure_stages(baseline_modules, os.path.abspath(args.workspace), args.rows, args.seed, args.repeats)
+    shutil.rmtree(args.workspace, ignore_errors=True)
+    failures = []
+    results = {}
+    for stage, (elapsed_ms, heaviest, error) in measured.items():
+        budget = budgets_ms[stage]
+        method = "imports" if stage in imports_only else "run"
+        if elapsed_ms > budget:
+            failures.append(stage)
+            status = "OVER BUDGET"
+        else:
+            status = "ok"
+        if error:
+            # Imports up to the failure are counted, so the figure is a lower bound
+            status += f" (incomplete, {error})"
+        results[stage] = {"import_ms": elapsed_ms, "budget_ms": budget, "method": method, "heaviest": [[name, us / 1000] for us, name in heaviest], "error": error}
+        print(f"{stage:<20} {method:<8} {elapsed_ms:>8.1f} ms / {budget:>5} ms  {status}  ({', '.join(f'{name} {us / 1000:.0f}ms' for us, name in heaviest[:3])})")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if failures:
+        print(f"Import-time budget exceeded for: {', '.join(failures)}")
+        sys.exit(1)
@@ -0,0 +1,103 @@
+import os
+import ast
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import numpy as np
+sys.path.append(os.path.abspath("./Benchmarks"))
+sys.path.append(os.path.abspath("./Utilities"))
+from syntheticDataGenerator import generate_chunk
+import pipelineLogging
+
+validation_script = "DataValidation/dataValidation.py"
+
+
+def load_validation_functions():
+    """Executes the import header and function definitions of the validation stage, without its module-level run."""
+    with open(validation_script) as f:
+        source = f.read()
+    tree = ast.parse(source)
+    namespace = {"__name__": "validation_benchmark"}
+    header = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+              or (isinstance(node, ast.Expr) and "sys.path" in ast.get_source_segment(source, node))]
+    exec(compile(ast.Module(body=header, type_ignores=[]), validation_script, "exec"), namespace)
+    # Metrics writes would be timed too; only the logging cost is of interest here
+    namespace["instrument"] = lambda step=None: (lambda func: func)
+    functions = [node for node in tree.body if isinstance(node, ast.FunctionDef)]
+    exec(compile(ast.Module(body=functions, type_ignores=[]), validation_script, "exec"), namespace)
+    namespace["report"] = []
+    return namespace
+
+
+def configure(mode, level, log_file):
+    pipelineLogging.stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    if mode == "sync":
+        # What every stage did before: logging.basicConfig(filename=...) writing on the calling thread
+        logging.basicConfig(filename=log_file, level=level, format='%(asctime)s:%(levelname)s:%(message)s', force=True)
+    elif mode == "queue":
+        pipelineLogging.setup_logging("benchmark", level=level, log_file=log_file)
+    else:
+        root.setLevel(logging.CRITICAL)
+
+
+def best_of(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def slow_down_writes(latency_ms):
+    """Adds a fixed delay to every log file flush, to stand in for a busy or network-mounted disk."""
+    flush = logging.FileHandler.flush
+
+    def delayed_flush(handler):
+        time.sleep(latency_ms / 1000)
+        flush(handler)
+    logging.FileHandler.flush = delayed_flush
+
+
+def run(rows, repeats, calls):
+    functions = load_validation_functions()
+    df = generate_chunk(rows, np.random.default_rng(106), duplicate_rate=0.05)
+    duplicates = df[df.duplicated()]
+    tmp_dir = tempfile.mkdtemp()
+    setups = [("disabled", "off", logging.CRITICAL), ("sync", "info", logging.INFO), ("queue", "info", logging.INFO),
+              ("sync", "debug", logging.DEBUG), ("queue", "debug", logging.DEBUG)]
+    print(f"{rows} rows, {len(duplicates)} duplicates, best of {repeats}")
+    print(f"{'handler':<10} {'level':<6} {'validation ms':>14} {'duplicates ms':>14} {'per call us':>12} {'full frame ms':>14} {'preview ms':>11}")
+    results = {}
+    for mode, level_name, level in setups:
+        log_file = os.path.join(tmp_dir, f"{mode}_{level_name}.log")
+        configure(mode, level, log_file)
+        validation_s = best_of(lambda: functions["validation"](df, functions["expected_schema"], "report.csv"), repeats)
+        duplicates_s = best_of(lambda: functions["identify_duplicates"](df), repeats)
+        # Caller-side cost of one lazily formatted record, the shape of the per-column lines
+        per_call_s = best_of(lambda: [logging.info("Column %s validation results are added as a row into the report %s", "age", "report.csv") for _ in range(calls)], repeats) / calls
+        # The old identify_duplicates message rendered the whole frame eagerly into an f-string
+        full_frame_s = best_of(lambda: logging.info(f"Duplicate records:\n{duplicates.to_string()}"), repeats)
+        preview_s = best_of(lambda: logging.info("Duplicate records (%d):\n%s", len(duplicates), pipelineLogging.FramePreview(duplicates)), repeats)
+        configure("disabled", logging.CRITICAL, None)
+        results[(mode, level_name)] = (validation_s, duplicates_s, per_call_s, full_frame_s, preview_s)
+        print(f"{mode:<10} {level_name:<6} {validation_s * 1000:>14.2f} {duplicates_s * 1000:>14.2f} {per_call_s * 1e6:>12.2f} {full_frame_s * 1000:>14.2f} {preview_s * 1000:>11.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure logging overhead in the validation hot path for synchronous and queue-based handlers")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=20000, help="log calls per repeat in the per-call measurement")
+    parser.add_argument("--write-latency-ms", type=float, default=0, help="simulated delay per log file flush")
+    args = parser.parse_args()
+    if args.write_latency_ms:
+        slow_down_writes(args.write_latency_ms)
+    run(args.rows, args.repeats, args.calls)
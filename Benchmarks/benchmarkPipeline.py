@@ -0,0 +1,197 @@
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+from datetime import datetime
+import pandas as pd
+sys.path.append(os.path.abspath("./Benchmarks"))
+from syntheticDataGenerator import write_dataset
+
+repo_root = os.path.abspath(".")
+results_dir = "Benchmarks/results"
+baseline_file = "Benchmarks/baseline.json"
+data_cache_dir = "Benchmarks/data"
+default_rows = [10000, 100000, 1000000, 10000000]
+min_delta_seconds = 0.5
+
+# (stage name, script) in DAG order; rawDataStorage is only run against a real Postgres
+stages = [
+    ("rawDataStorage", "RawDataStorage/rawDataStorage.py"),
+    ("dataValidation", "DataValidation/dataValidation.py"),
+    ("dataPreparation", "DataPreparation/DataPreparation.py"),
+    ("dataTransformation", "DataTransformation/dataTransformation.py"),
+    ("featureStore", "FeatureStore/Feature_Store.py"),
+    ("model", "Model/model.py"),
+]
+code_dirs = ["Configurations", "Utilities", "RawDataStorage", "DataValidation", "DataPreparation", "DataTransformation", "FeatureStore", "Model"]
+data_dirs = ["Staging/IN", "Staging/OUT", "Staging/Cleansed_data", "Outputfiles", "Model", "logs", "DataPreparation/Visualizations"]
+
+
+def prepare_workspace(workspace):
+    """Copies the stage scripts into a scratch tree so benchmark outputs never touch the repo's data folders."""
+    if os.path.exists(workspace):
+        shutil.rmtree(workspace)
+    for code_dir in code_dirs:
+        for path in glob.glob(os.path.join(repo_root, code_dir, "**", "*.py"), recursive=True) + glob.glob(os.path.join(repo_root, code_dir, "**", "*.yaml"), recursive=True):
+            target = os.path.join(workspace, os.path.relpath(path, repo_root))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy(path, target)
+    for data_dir in data_dirs:
+        os.makedirs(os.path.join(workspace, data_dir), exist_ok=True)
+
+
+def synthetic_file(rows, seed):
+    # rawDataStorage only exports rows ingested today, so the cached file is keyed on today's date
+    ingestion_date = datetime.now().strftime("%Y-%m-%d")
+    os.makedirs(data_cache_dir, exist_ok=True)
+    path = os.path.join(data_cache_dir, f"telecom_customers_synthetic_{rows}_{seed}_{ingestion_date}.csv")
+    if not os.path.exists(path):
+        for stale in glob.glob(os.path.join(data_cache_dir, f"telecom_customers_synthetic_{rows}_{seed}_*.csv")):
+            os.remove(stale)
+        start = time.perf_counter()
+        write_dataset(path, rows, seed=seed, ingestion_date=ingestion_date)
+        print(f"Generated {rows} rows in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def run_stage(script, workspace, env):
+    start = time.perf_counter()
+    # stderr goes to a file: wait4 does not read a pipe, so a stage writing more than a pipe buffer would block
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen([sys.executable, script], cwd=workspace, env=env, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        # wait4 gives the resource usage of this child alone, unlike RUSAGE_CHILDREN
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        returncode = os.waitstatus_to_exitcode(status)
+        # The child is already reaped; tell Popen so it does not wait on the pid again
+        process.returncode = returncode
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors="replace")
+    peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {"seconds": elapsed, "peak_rss_bytes": peak, "cpu_seconds": usage.ru_utime + usage.ru_stime,
+            "returncode": returncode, "error": stderr.strip().splitlines()[-1] if returncode and stderr.strip() else None}
+
+
+def load_into_postgres(csv_path, table):
+    sys.path.append(os.path.abspath("./Configurations"))
+    import dbConfig as db
+    import psycopg2
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    column_defs = ", ".join(f"{col} {'date' if col == 'ingestiondate' else 'varchar(100)'}" for col in columns)
+    connection = psycopg2.connect(**db.DB_PARAMS)
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"CREATE TABLE {table} ({column_defs})")
+    with open(csv_path) as f:
+        cursor.copy_expert(f"COPY {table} FROM STDIN WITH CSV HEADER", f)
+    # dataTransformation inserts into the warehouse table, so give it an empty copy to write to
+    cursor.execute(f"DROP TABLE IF EXISTS {table}_dw")
+    cursor.execute(f"CREATE TABLE {table}_dw (LIKE {db.dw_tablename})")
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def stand_in_feature_store(workspace):
+    # Without feast, hand the transformed data to the model stage the way Outputfiles/ would receive it
+    start = time.perf_counter()
+    for path in glob.glob(os.path.join(workspace, "Staging/Cleansed_data", "*.csv")):
+        shutil.copy(path, os.path.join(workspace, "Outputfiles", os.path.basename(path)))
+    for path in glob.glob(os.path.join(workspace, "Staging/Cleansed_data", "*.parquet")):
+        pd.read_parquet(path).to_csv(os.path.join(workspace, "Outputfiles", os.path.basename(path)[:-len(".parquet")] + ".csv"), index=False)
+    return {"seconds": time.perf_counter() - start, "peak_rss_bytes": None, "cpu_seconds": None, "returncode": 0, "error": None, "stand_in": True}
+
+
+def benchmark_rows(rows, workspace, seed, use_postgres, chunk_size=0):
+    csv_path = synthetic_file(rows, seed)
+    prepare_workspace(workspace)
+    run_id = f"benchmark_{rows}"
+    env = dict(os.environ, PIPELINE_RUN_ID=run_id)
+    if chunk_size:
+        env["CHUNK_SIZE"] = str(chunk_size)
+    results = {}
+    if use_postgres:
+        table = f"benchmark_telecom_customers_{rows}"
+        load_into_postgres(csv_path, table)
+        env.update(TABLENAME=table, DW_TABLENAME=f"{table}_dw")
+    else:
+        # Without Postgres nothing is loaded into the warehouse; dbConfig's defaults are the real tables
+        env["SKIP_DW_LOAD"] = "1"
+        # Stand-in for Postgres: place the export rawDataStorage would have written
+        start = time.perf_counter()
+        shutil.copy(csv_path, os.path.join(workspace, "Staging/IN", os.path.basename(csv_path)))
+        results["rawDataStorage"] = {"seconds": time.perf_counter() - start, "peak_rss_bytes": None, "cpu_seconds": None, "returncode": 0, "error": None, "stand_in": True}
+    for stage, script in stages:
+        if stage in results:
+            continue
+        if stage == "featureStore" and importlib.util.find_spec("feast") is None:
+            results[stage] = stand_in_feature_store(workspace)
+            continue
+        results[stage] = run_stage(script, workspace, env)
+        status = "ok" if results[stage]["returncode"] == 0 else f"exit {results[stage]['returncode']}: {results[stage]['error']}"
+        print(f"{rows:>10} {stage:<20} {results[stage]['seconds']:>9.2f}s {results[stage]['peak_rss_bytes'] / 2**20:>9.1f} MiB  {status}")
+    metrics_path = os.path.join(workspace, "logs", f"metrics_{run_id}.jsonl")
+    if os.path.exists(metrics_path):
+        with open(metrics_path) as f:
+            results["steps"] = [json.loads(line) for line in f if line.strip()]
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for rows, stage_results in results["rows"].items():
+        for stage, current in stage_results.items():
+            previous = baseline.get("rows", {}).get(rows, {}).get(stage)
+            # Stages that fail without a database still time their file work, so compare like with like
+            if stage == "steps" or previous is None or current.get("returncode") != previous.get("returncode"):
+                continue
+            for metric in ["seconds", "peak_rss_bytes"]:
+                if current.get(metric) is None or not previous.get(metric):
+                    continue
+                # Sub-second stages are dominated by interpreter start-up noise
+                if metric == "seconds" and current[metric] - previous[metric] < min_delta_seconds:
+                    continue
+                ratio = current[metric] / previous[metric]
+                if ratio > 1 + tolerance:
+                    regressions.append(f"{rows} rows {stage} {metric}: {previous[metric]:.4g} -> {current[metric]:.4g} ({ratio:.2f}x)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline stages on synthetic data and compare against a baseline")
+    parser.add_argument("--rows", type=int, nargs="+", default=default_rows)
+    parser.add_argument("--seed", type=int, default=106)
+    parser.add_argument("--workspace", default="Benchmarks/workspace")
+    parser.add_argument("--postgres", action="store_true", help="load the data into the Postgres in dbConfig instead of the file stand-in")
+    parser.add_argument("--chunk-size", type=int, default=0, help="run preparation and transformation out of core in chunks of this many rows")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown or memory growth before flagging a regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {"created_at": datetime.now().isoformat(), "seed": args.seed, "postgres": args.postgres, "chunk_size": args.chunk_size, "rows": {}}
+    for rows in args.rows:
+        results["rows"][str(rows)] = benchmark_rows(rows, os.path.abspath(args.workspace), args.seed, args.postgres, args.chunk_size)
+
+    os.makedirs(results_dir, exist_ok=True)
+    results_path = os.path.join(results_dir, f"benchmark_{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {results_path}")
+
+    if args.save_baseline:
+        shutil.copy(results_path, baseline_file)
+        print(f"Baseline saved to {baseline_file}")
+    elif os.path.exists(baseline_file):
+        with open(baseline_file) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import logging
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath("./Scoring"))
+sys.path.append(os.path.abspath("./Utilities"))
+from churnScorer import ModelLoader, target_column
+from batchScoring import score_file, latest_input_file
+from scoringService import start_service
+from pipelineLogging import setup_logging
+
+# Logging configuration
+date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+setup_logging("benchmarkScoring", log_file=f'logs/benchmarkScoring_{date_time}.log')
+
+batch_rows = 200000
+batch_chunk_sizes = [10000, 50000]
+service_clients = 32
+service_requests_per_client = 50
+
+
+def benchmark_batch(loader, sample, rows=batch_rows, chunk_sizes=batch_chunk_sizes):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "input.csv")
+        repeats = -(-rows // len(sample))
+        pd.concat([sample] * repeats, ignore_index=True).head(rows).to_csv(input_path, index=False)
+        for chunk_size in chunk_sizes:
+            output_path = os.path.join(tmp_dir, f"predictions_{chunk_size}.csv")
+            scored, elapsed = score_file(loader, input_path, output_path, chunk_size)
+            results.append({"chunk_size": chunk_size, "rows": scored, "seconds": elapsed, "rows_per_second": scored / elapsed})
+    return results
+
+
+async def client(host, port, records, n_requests, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(records).encode()
+    request = f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def benchmark_service(loader, sample, clients=service_clients, requests_per_client=service_requests_per_client):
+    server, batcher, batcher_task = await start_service(loader, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    records = json.loads(sample.head(clients).to_json(orient="records"))
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[client("127.0.0.1", port, [records[i % len(records)]], requests_per_client, latencies) for i in range(clients)])
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+    batcher_task.cancel()
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "mean_batch_size": batcher.rows / max(batcher.batches, 1),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+if __name__ == "__main__":
+    logging.info("------------------BenchmarkScoring started------------------")
+    input_path = sys.argv[1] if len(sys.argv) > 1 else latest_input_file()
+    loader = ModelLoader()
+    if input_path is None or loader.get_model() is None:
+        print("Benchmark needs an input file in Outputfiles/ and a model in Model/")
+        logging.error("Benchmark needs an input file in Outputfiles/ and a model in Model/")
+    else:
+        sample = pd.read_csv(input_path).drop(columns=[target_column], errors="ignore")
+        for result in benchmark_batch(loader, sample):
+            print(f"batch  chunk_size={result['chunk_size']:>6} rows={result['rows']} {result['seconds']:.2f}s {result['rows_per_second']:.0f} rows/s")
+            logging.info(f"Batch benchmark: {result}")
+        result = asyncio.run(benchmark_service(loader, sample))
+        print(f"service clients={result['clients']} {result['requests_per_second']:.0f} req/s "
+              f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms p99={result['p99_ms']:.1f}ms "
+              f"mean_batch={result['mean_batch_size']:.1f}")
+        logging.info(f"Service benchmark: {result}")
+    logging.info("------------------BenchmarkScoring completed------------------")
@@ -0,0 +1,156 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath("./Configurations"))
+from schemaConfig import expected_schema
+
+# Category frequencies follow the Kaggle telco dataset in Inputfiles/
+yes_no_rates = {
+    "married": 0.483, "referredafriend": 0.457, "phoneservice": 0.903, "multiplelines": 0.422,
+    "internetservice": 0.783, "onlinesecurity": 0.287, "onlinebackup": 0.345,
+    "deviceprotectionplan": 0.344, "premiumtechsupport": 0.29, "streamingtv": 0.384,
+    "streamingmovies": 0.388, "streamingmusic": 0.353, "unlimiteddata": 0.674, "paperlessbilling": 0.592,
+}
+categories = {
+    "gender": (["Male", "Female"], [0.505, 0.495]),
+    "offer": ([None, "Offer B", "Offer E", "Offer D", "Offer A", "Offer C"], [0.55, 0.117, 0.114, 0.085, 0.074, 0.06]),
+    "internettype": (["Fiber Optic", "DSL", "Cable"], [0.55, 0.30, 0.15]),
+    "contract": (["Month-to-Month", "Two Year", "One Year"], [0.513, 0.267, 0.22]),
+    "paymentmethod": (["Bank Withdrawal", "Credit Card", "Mailed Check"], [0.555, 0.39, 0.055]),
+    "satisfactionscore": ([3, 4, 5, 1, 2], [0.378, 0.254, 0.163, 0.131, 0.074]),
+    "customerstatus": (["Stayed", "Churned", "Joined"], [0.67, 0.265, 0.065]),
+}
+churn_reasons = {
+    "Competitor": ["Competitor had better devices", "Competitor made better offer", "Competitor offered more data", "Competitor offered higher download speeds"],
+    "Attitude": ["Attitude of support person", "Attitude of service provider"],
+    "Dissatisfaction": ["Product dissatisfaction", "Network reliability", "Service dissatisfaction", "Limited range of services", "Poor expertise of online support"],
+    "Price": ["Price too high", "Long distance charges", "Extra data charges", "Lack of affordable download/upload speed"],
+    "Other": ["Moved", "Deceased", "Don't know"],
+}
+churn_category_rates = [0.45, 0.17, 0.16, 0.115, 0.105]
+n_cities = 1106
+nullable_columns = ["gender", "paymentmethod", "contract", "monthlycharge", "latitude", "longitude"]
+outlier_columns = ["monthlycharge", "population", "avgmonthlygbdownload", "avgmonthlylongdistancecharges"]
+
+
+def choice(rng, values, probabilities, size):
+    probabilities = np.asarray(probabilities, dtype=float)
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=probabilities / probabilities.sum())]
+
+
+def yes_no(mask):
+    return np.where(mask, "Yes", "No").astype(object)
+
+
+def generate_chunk(rows, rng, start_id=0, ingestion_date=None, null_rate=0.01, duplicate_rate=0.01, outlier_rate=0.002):
+    """Returns a frame shaped like a Staging/IN export with nulls, outliers and duplicate rows injected."""
+    ingestion_date = ingestion_date or pd.Timestamp.now().strftime("%Y-%m-%d")
+    ids = np.arange(start_id, start_id + rows)
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    customer_ids = pd.Series(ids % 10000).astype(str).str.zfill(4) + "-"
+    for k in reversed(range(5)):
+        customer_ids = customer_ids + letters[(ids // 10000 // 26 ** k) % 26]
+    df = pd.DataFrame({"customerid": customer_ids.to_numpy(dtype=object)})
+
+    df["gender"] = choice(rng, *categories["gender"], rows)
+    age = rng.integers(19, 81, rows)
+    df["age"] = age
+    df["under30"] = yes_no(age < 30)
+    df["seniorcitizen"] = yes_no(age >= 65)
+    df["married"] = yes_no(rng.random(rows) < yes_no_rates["married"])
+    dependents = rng.random(rows) < 0.231
+    df["dependents"] = yes_no(dependents)
+    df["numberofdependents"] = np.where(dependents, rng.integers(1, 4, rows), 0)
+    df["country"] = "United States"
+    df["state"] = "California"
+    # City popularity is heavy tailed, like the real Los Angeles / San Diego / small-town split
+    city_weights = 1.0 / np.arange(1, n_cities + 1)
+    city_index = rng.choice(n_cities, size=rows, p=city_weights / city_weights.sum())
+    df["city"] = np.char.add("City ", city_index.astype(str)).astype(object)
+    df["zipcode"] = 90001 + (city_index * 5.57).astype(int)
+    df["latitude"] = np.round(32.55 + (city_index % 941) / 941 * 9.4, 6)
+    df["longitude"] = np.round(-124.3 + (city_index % 613) / 613 * 10.1, 6)
+    df["population"] = np.clip(rng.lognormal(9.3, 1.4, rows), 11, 105285).astype(int)
+    df["quarter"] = "Q3"
+    referred = rng.random(rows) < yes_no_rates["referredafriend"]
+    df["referredafriend"] = yes_no(referred)
+    df["numberofreferrals"] = np.where(referred, rng.integers(1, 12, rows), 0)
+    tenure = rng.integers(1, 73, rows)
+    df["tenureinmonths"] = tenure
+    df["offer"] = choice(rng, *categories["offer"], rows)
+    phone = rng.random(rows) < yes_no_rates["phoneservice"]
+    df["phoneservice"] = yes_no(phone)
+    long_distance = np.where(phone, np.round(rng.uniform(1, 50, rows), 2), 0.0)
+    df["avgmonthlylongdistancecharges"] = long_distance
+    df["multiplelines"] = yes_no(phone & (rng.random(rows) < 0.47))
+    internet = rng.random(rows) < yes_no_rates["internetservice"]
+    df["internetservice"] = yes_no(internet)
+    df["internettype"] = np.where(internet, choice(rng, *categories["internettype"], rows), None)
+    df["avgmonthlygbdownload"] = np.where(internet, rng.integers(2, 86, rows), 0).astype(float)
+    for column in ["onlinesecurity", "onlinebackup", "deviceprotectionplan", "premiumtechsupport", "streamingtv", "streamingmovies", "streamingmusic", "unlimiteddata"]:
+        df[column] = yes_no(internet & (rng.random(rows) < yes_no_rates[column] / yes_no_rates["internetservice"]))
+    df["contract"] = choice(rng, *categories["contract"], rows)
+    df["paperlessbilling"] = yes_no(rng.random(rows) < yes_no_rates["paperlessbilling"])
+    df["paymentmethod"] = choice(rng, *categories["paymentmethod"], rows)
+    monthly = np.round(rng.uniform(18.25, 118.75, rows), 2)
+    df["monthlycharge"] = monthly
+    total_charges = np.round(monthly * tenure, 2)
+    refunds = np.where(rng.random(rows) < 0.075, np.round(rng.uniform(0, 49.79, rows), 2), 0.0)
+    extra_data = np.where(rng.random(rows) < 0.1, rng.integers(1, 16, rows) * 10, 0).astype(float)
+    total_long_distance = np.round(long_distance * tenure, 2)
+    df["totalcharges"] = total_charges
+    df["totalrefunds"] = refunds
+    df["totalextradatacharges"] = extra_data
+    df["totallongdistancecharges"] = total_long_distance
+    df["totalrevenue"] = np.round(total_charges - refunds + extra_data + total_long_distance, 2)
+    df["satisfactionscore"] = choice(rng, *categories["satisfactionscore"], rows).astype(int)
+    status = choice(rng, *categories["customerstatus"], rows)
+    churned = status == "Churned"
+    df["customerstatus"] = status
+    df["churnlabel"] = yes_no(churned)
+    df["churnscore"] = np.where(churned, rng.integers(65, 97, rows), rng.integers(5, 81, rows))
+    df["cltv"] = rng.integers(2003, 6501, rows)
+    category_index = rng.choice(len(churn_reasons), size=rows, p=churn_category_rates)
+    reason_table = [reasons for reasons in churn_reasons.values()]
+    reason_index = rng.integers(0, 60, rows) % np.array([len(reasons) for reasons in reason_table])[category_index]
+    flat_reasons = np.array([reason for reasons in reason_table for reason in reasons], dtype=object)
+    reason_offsets = np.cumsum([0] + [len(reasons) for reasons in reason_table])[:-1]
+    reason = flat_reasons[reason_offsets[category_index] + reason_index]
+    df["churncategory"] = np.where(churned, np.array(list(churn_reasons), dtype=object)[category_index], None)
+    df["churnreason"] = np.where(churned, reason, None)
+    df["ingestiondate"] = ingestion_date
+
+    for column in nullable_columns:
+        df.loc[rng.random(rows) < null_rate, column] = None
+    for column in outlier_columns:
+        mask = rng.random(rows) < outlier_rate
+        df.loc[mask, column] = (df.loc[mask, column] * rng.uniform(5, 20, mask.sum())).astype(df[column].dtype)
+    if duplicate_rate > 0 and rows > 1:
+        # Overwrite a sample of rows with copies of other rows from the same chunk
+        row_index = np.arange(rows)
+        targets = np.flatnonzero(rng.random(rows) < duplicate_rate)
+        row_index[targets] = rng.integers(0, rows, len(targets))
+        df = df.take(row_index).reset_index(drop=True)
+    return df[list(expected_schema)]
+
+
+def write_dataset(output_path, rows, chunk_size=500000, seed=106, **kwargs):
+    """Writes rows synthetic records to a CSV in chunks so 10M-row files never sit in memory."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    written = 0
+    while written < rows:
+        n = min(chunk_size, rows - written)
+        chunk = generate_chunk(n, rng, start_id=written, **kwargs)
+        chunk.to_csv(output_path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += n
+    return output_path
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+    output_path = sys.argv[2] if len(sys.argv) > 2 else f"Staging/IN/telecom_customers_synthetic_{date_time}.csv"
+    write_dataset(output_path, rows)
+    print(f"{rows} synthetic rows written to {output_path}")
@@ -1,4 +1,4 @@
-import psycopg2
+import os
 
 DB_PARAMS = {
     "dbname": "postgres",
@@ -7,7 +7,8 @@ DB_PARAMS = {
     "host": "localhost", 
     "port": "5432", 
 }
-tablename = "telecom_customers"
-dw_tablename = "customers"
+# Table names can be overridden so benchmarks run against scratch tables
+tablename = os.environ.get("TABLENAME", "telecom_customers")
+dw_tablename = os.environ.get("DW_TABLENAME", "customers")
 kaggle_username = "gnvsn556"
 kaggle_key = "e8f5ece6ea0133bdc518d1ca7edf85ce"
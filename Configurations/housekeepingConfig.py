@@ -0,0 +1,22 @@
+import os
+
+# Directories that gain one timestamped file per pipeline run; identical files are dropped and
+# older ones are compacted into daily, then monthly, Parquet partitions in the same directory
+data_dirs = ["Inputfiles", "Staging/IN", "Staging/OUT", "Staging/Cleansed_data", "Outputfiles"]
+daily_after_days = int(os.environ.get("HOUSEKEEPING_DAILY_AFTER_DAYS", "1"))
+monthly_after_days = int(os.environ.get("HOUSEKEEPING_MONTHLY_AFTER_DAYS", "31"))
+
+# Files matching each pattern are deleted once they are older than the given number of days
+log_retention_days = int(os.environ.get("LOG_RETENTION_DAYS", "14"))
+report_retention_days = int(os.environ.get("REPORT_RETENTION_DAYS", "30"))
+retention = {
+    "logs/*.log": log_retention_days,
+    "logs/*.log.*": log_retention_days,
+    "logs/metrics_*.jsonl": log_retention_days,
+    "logs/run_summary_*.txt": log_retention_days,
+    "logs/profile_*": log_retention_days,
+    "DataValidation/validation_report_*.csv": report_retention_days,
+}
+
+# Housekeeping competes with the pipeline for disk, so it runs at a lower CPU priority
+niceness = int(os.environ.get("HOUSEKEEPING_NICE", "10"))
@@ -0,0 +1,26 @@
+# Expected schema: column -> expected type
+expected_schema = {
+    'customerid': 'object', 'gender': 'object', 'age': 'int64', 
+    'under30': 'object', 'seniorcitizen': 'object', 'married': 'object', 
+    'dependents': 'object', 'numberofdependents': 'int64', 
+    'country': 'object', 'state': 'object', 'city': 'object', 
+    'zipcode': 'object', 'latitude': 'float64', 'longitude': 'float64', 
+    'population': 'int64', 'quarter': 'object', 'referredafriend': 'object', 
+    'numberofreferrals': 'int64', 'tenureinmonths': 'int64', 
+    'offer': 'object', 'phoneservice': 'object', 
+    'avgmonthlylongdistancecharges': 'float64', 'multiplelines': 'object', 
+    'internetservice': 'object', 'internettype': 'object', 
+    'avgmonthlygbdownload': 'float64', 'onlinesecurity': 'object', 
+    'onlinebackup': 'object', 'deviceprotectionplan': 'object', 
+    'premiumtechsupport': 'object', 'streamingtv': 'object', 
+    'streamingmovies': 'object', 'streamingmusic': 'object', 
+    'unlimiteddata': 'object', 'contract': 'object', 
+    'paperlessbilling': 'object', 'paymentmethod': 'object', 
+    'monthlycharge': 'float64', 'totalcharges': 'float64', 
+    'totalrefunds': 'float64', 'totalextradatacharges': 'float64', 
+    'totallongdistancecharges': 'float64', 'totalrevenue': 'float64', 
+    'satisfactionscore': 'int64', 'customerstatus': 'object', 
+    'churnlabel': 'object', 'churnscore': 'int64', 'cltv': 'int64', 
+    'churncategory': 'object', 'churnreason': 'object', 
+    'ingestiondate': 'object'
+}
@@ -1,6 +1,75 @@
+import os
+import sys
 import subprocess
 import datetime
-from prefect import task, flow
+from prefect import task, flow, get_run_logger
+sys.path.append(os.path.abspath("./Utilities"))
+from stageCache import run_cached
+
+# What each stage reads and writes, for the stage cache. A stage whose inputs, code, config and
+# DB watermark match an earlier successful run restores that run's outputs instead of running.
+# Ingestion always runs: its input is whatever Kaggle serves at the time. Inputs list Parquet as
+# well as CSV wherever the stage reads both, since housekeeping compacts older CSVs into Parquet.
+stage_specs = {
+    "rawDataStorage": {
+        "script": "RawDataStorage/rawDataStorage.py",
+        "outputs": ["Staging/IN/*.csv"],
+        "config": ["TABLENAME"],
+        "watermark_table": "tablename",
+    },
+    "dataValidation": {
+        "script": "DataValidation/dataValidation.py",
+        "inputs": ["Staging/IN/*.csv", "Staging/IN/*.parquet"],
+        "outputs": ["DataValidation/validation_report_*.csv"],
+    },
+    "dataPreparation": {
+        "script": "DataPreparation/DataPreparation.py",
+        "inputs": ["Staging/IN/*.csv", "Staging/IN/*.parquet"],
+        "outputs": ["Staging/OUT/*.csv", "Staging/OUT/*.parquet", "DataPreparation/Visualizations/**/*"],
+        "config": ["SKIP_EDA", "CHUNK_SIZE"],
+    },
+    "dataTransformation": {
+        "script": "DataTransformation/dataTransformation.py",
+        "inputs": ["Staging/OUT/*.csv", "Staging/OUT/*.parquet"],
+        "outputs": ["Staging/Cleansed_data/*.csv", "Staging/Cleansed_data/*.parquet"],
+        "config": ["DW_TABLENAME", "CHUNK_SIZE", "SKIP_DW_LOAD"],
+    },
+    "featureStore": {
+        "script": "FeatureStore/Feature_Store.py",
+        "inputs": ["Staging/Cleansed_data/*.csv", "Staging/Cleansed_data/*.parquet"],
+        "code": ["FeatureStore/feature_repo/feature_repo/*.py", "FeatureStore/feature_repo/feature_repo/*.yaml"],
+        "outputs": ["FeatureStore/feature_repo/feature_repo/data/*.parquet", "Outputfiles/*.csv"],
+    },
+    "model": {
+        "script": "Model/model.py",
+        "inputs": ["Outputfiles/*.csv", "Outputfiles/*.parquet"],
+        "code": ["Model/modelRegistry.py"],
+        "outputs": ["Model/churn_model_*.joblib"],
+    },
+}
+
+
+def run_stage(stage):
+    spec = stage_specs[stage]
+    watermark_table = None
+    if "watermark_table" in spec:
+        sys.path.append(os.path.abspath("./Configurations"))
+        import dbConfig as db
+        watermark_table = getattr(db, spec["watermark_table"])
+    result = run_cached(
+        stage,
+        ["python", spec["script"]],
+        inputs=spec.get("inputs", []),
+        outputs=spec.get("outputs", []),
+        code=[spec["script"]] + spec.get("code", []),
+        config={key: os.environ.get(key) for key in spec.get("config", [])},
+        watermark_table=watermark_table,
+    )
+    if result["cache"] == "hit":
+        get_run_logger().info(f"{stage}: cache hit, saved {result['saved_seconds']:.1f}s")
+    else:
+        get_run_logger().info(f"{stage}: cache {result['cache']}, exit code {result['returncode']}")
+    return result
 
 @task
 def run_DataIngestion():
@@ -9,37 +78,45 @@ def run_DataIngestion():
 
 @task
 def run_RawDataStorage():
-    rawDataStorage = subprocess.run(["python", "RawDataStorage/rawDataStorage.py"])
-    return rawDataStorage.stdout, rawDataStorage.stderr
+    return run_stage("rawDataStorage")
 
 @task
 def run_DataValidation():
-    dataValidation = subprocess.run(["python", "DataValidation/dataValidation.py"])
-    return dataValidation.stdout, dataValidation.stderr
+    return run_stage("dataValidation")
 
 @task
 def run_DataPreparation():
-    dataPreparation = subprocess.run(["python", "DataPreparation/dataPreparation.py"])
-    return dataPreparation.stdout, dataPreparation.stderr
+    return run_stage("dataPreparation")
 
 @task
 def run_DataTransformation():
-    dataTransformation = subprocess.run(["python", "DataTransformation/dataTransformation.py"])
-    return dataTransformation.stdout, dataTransformation.stderr
+    return run_stage("dataTransformation")
 
 @task
 def run_FeatureStore():
-    dataFeatureStore = subprocess.run(["python", "FeatureStore/Feature_Store.py"])
-    return dataFeatureStore.stdout, dataFeatureStore.stderr
+    return run_stage("featureStore")
 
 @task
 def run_Model():
-    dataModel = subprocess.run(["python", "Model/model.py"])
-    return dataModel.stdout, dataModel.stderr
+    return run_stage("model")
+
+# Tagged so a Prefect concurrency limit can keep housekeeping off workers that run stages;
+# the script itself also lowers its CPU priority
+@task(tags=["housekeeping"])
+def run_Housekeeping():
+    housekeeping = subprocess.run(["python", "Utilities/housekeeping.py"])
+    return housekeeping.stdout, housekeeping.stderr
+
+@task
+def run_Summary():
+    summary = subprocess.run(["python", "Utilities/instrumentation.py", os.environ["PIPELINE_RUN_ID"]])
+    return summary.stdout, summary.stderr
 
 
 @flow
 def DMMLGroup106() -> str:
+    # Every stage subprocess inherits the run id and appends its step metrics to logs/metrics_<run id>.jsonl
+    os.environ["PIPELINE_RUN_ID"] = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
     run_DataIngestion()
     run_RawDataStorage()
     run_DataValidation()
@@ -47,6 +124,8 @@ def DMMLGroup106() -> str:
     run_DataTransformation()
     run_FeatureStore()
     run_Model()
+    run_Housekeeping()
+    run_Summary()
     return "Done"
 
 if __name__ == "__main__":
@@ -55,4 +134,4 @@ if __name__ == "__main__":
         cron="0 * * * *"
         )
     deployment.apply()
-    print("Deployment created with daily schedule")
\ No newline at end of file
+    print("Deployment created with daily schedule")
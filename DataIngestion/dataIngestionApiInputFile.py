@@ -1,11 +1,13 @@
 import os
 import sys
 sys.path.append(os.path.abspath("./Configurations"))
+sys.path.append(os.path.abspath("./Utilities"))
 import dbConfig as db
 import psycopg2
 import pandas as pd
 import logging
-from kaggle.api.kaggle_api_extended import KaggleApi
+from instrumentation import init_stage, instrument
+from pipelineLogging import setup_logging
 
 # Set environment variables for Kaggle API credentials
 os.environ['KAGGLE_USERNAME'] = db.kaggle_username
@@ -13,15 +15,17 @@ os.environ['KAGGLE_KEY'] = db.kaggle_key
 
 # Logging configuration
 date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
-log_file = f'logs/dataIngestion_{date_time}.log'
-logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+setup_logging("dataIngestion")
+init_stage("dataIngestion")
 
 
 ############################### PART 1 ###############################
 # Download the dataset from Kaggle
 
+@instrument()
 def download_dataset():
     try:
+        from kaggle.api.kaggle_api_extended import KaggleApi
         api = KaggleApi()
         api.authenticate()
         dataset = 'alfathterry/telco-customer-churn-11-1-3'
@@ -32,6 +36,7 @@ def download_dataset():
         print("Error in downloading the dataset")
         logging.error("Error in downloading the dataset")
 
+@instrument()
 def file_columns_update(date_time):
     try:
         dataset = pd.read_csv('Inputfiles/telco.csv')
@@ -82,6 +87,7 @@ def table_creation(tablename):
         print("Error in creating the table")
         logging.error("Error in creating the table")
 
+@instrument()
 def insert_data(tablename, dataset):
     try:
         for index, row in dataset.iterrows():
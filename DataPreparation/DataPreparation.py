@@ -1,28 +1,33 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
 import glob
-import matplotlib.pyplot as plt
-import seaborn as sns
 import logging
-from scipy import stats
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler, MinMaxScaler, OneHotEncoder, LabelEncoder
-from dateutil.relativedelta import relativedelta
+sys.path.append(os.path.abspath("./Utilities"))
+from instrumentation import init_stage, instrument, track
+from pipelineLogging import setup_logging
+from chunkedProcessing import chunk_size
+
+# Imputation, scaling and outlier scores are plain pandas arithmetic, the same the chunked path
+# uses, so no run imports sklearn; matplotlib and seaborn are only imported when EDA runs
+run_eda = os.environ.get("SKIP_EDA", "0") != "1"
 
 # Configure logging
 date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
-log_file = f'logs/dataPreparation_{date_time}.log'
-logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+setup_logging("dataPreparation")
+init_stage("dataPreparation")
 
 
+@instrument()
 def read_all_csv_files(directory_path):
     try:
         os.makedirs(directory_path, exist_ok=True)
-        all_files = glob.glob(os.path.join(directory_path, "*.csv"))
+        # Housekeeping compacts older hourly files into Parquet partitions
+        all_files = glob.glob(os.path.join(directory_path, "*.csv")) + glob.glob(os.path.join(directory_path, "*.parquet"))
         df_list = []
         for file in all_files:
-            df = pd.read_csv(file)
+            df = pd.read_parquet(file) if file.endswith(".parquet") else pd.read_csv(file)
             df_list.append(df)
         combined_df = pd.concat(df_list, ignore_index=True)
         logging.info("All CSV files read successfully")
@@ -31,19 +36,117 @@ def read_all_csv_files(directory_path):
         logging.error("Error in creating the directory")
 
 
+def add_customer_joined_date(df):
+    # Vectorised ingestiondate - relativedelta(months=tenureinmonths), clipping to month end like relativedelta does
+    ingestion = pd.to_datetime(df['ingestiondate'])
+    months = ingestion.dt.year * 12 + ingestion.dt.month - 1 - df['tenureinmonths']
+    month_start = pd.to_datetime(pd.DataFrame({"year": months // 12, "month": months % 12 + 1, "day": 1}))
+    day = np.minimum(ingestion.dt.day, month_start.dt.days_in_month)
+    df['customer_joined_date'] = month_start + pd.to_timedelta(day - 1, unit="D") + (ingestion - ingestion.dt.normalize())
+    return df
+
+
+def prepare_chunk(chunk):
+    chunk['tenureinmonths'] = chunk['tenureinmonths'].astype(int)
+    chunk = add_customer_joined_date(chunk)
+    return chunk.drop(columns=['tenureinmonths', 'totalcharges', 'totalrefunds', 'totalextradatacharges', 'totallongdistancecharges', 'totalrevenue'])
+
+
+@instrument()
+def prepare_in_chunks(directory_path, output_file_path):
+    """Out-of-core version of this script for CHUNK_SIZE > 0.
+
+    Pass 1 accumulates column kinds, medians, modes and moments; pass 2 deduplicates, imputes,
+    scales and flags outliers chunk by chunk, writing Parquet instead of CSV. The sparse
+    encoding dump and EDA plots need the whole frame and are skipped.
+    """
+    from chunkedProcessing import iter_chunks, column_kind, merge_kind, conform, RunningStats, QuantileSketch, ModeCounter, RowDeduplicator, ParquetChunkWriter
+    kinds, moments, sketches, modes = {}, {}, {}, {}
+    with track("statistics_pass") as step:
+        rows = 0
+        for chunk in iter_chunks(directory_path, chunk_size):
+            chunk = prepare_chunk(chunk)
+            rows += len(chunk)
+            for col in chunk.columns:
+                kind = column_kind(chunk[col])
+                kinds[col] = merge_kind(kinds.get(col), kind)
+                if kind in ("int", "float"):
+                    moments.setdefault(col, RunningStats()).update(chunk[col])
+                    sketches.setdefault(col, QuantileSketch()).update(chunk[col])
+                if kind not in ("float", "null"):
+                    modes.setdefault(col, ModeCounter()).update(chunk[col])
+        step.rows_in = rows
+    # Same split select_dtypes makes on the concatenated frame; the joined date is object dtype in memory
+    num_cols = [col for col, kind in kinds.items() if kind in ("int", "float")]
+    cat_cols = [col for col, kind in kinds.items() if kind in ("string", "datetime")]
+
+    medians = {col: sketches[col].quantile(0.5) for col in num_cols}
+    fill_values = {col: modes[col].mode() if col in modes else np.nan for col in cat_cols}
+    fill_values = {col: pd.Timestamp(value) if kinds[col] == "datetime" and pd.notna(value) else value for col, value in fill_values.items()}
+    means, scales, quartiles = {}, {}, {}
+    for col in num_cols:
+        # Moments and quartiles of the imputed column: the nulls all become the median
+        imputed = RunningStats().merge(moments[col]).add_constant(medians[col], moments[col].nulls)
+        imputed_sketch = QuantileSketch().merge(sketches[col]).add_constant(medians[col], moments[col].nulls)
+        means[col] = imputed.mean
+        scales[col] = imputed.std if imputed.std > 10 * np.finfo(float).eps else 1.0
+        quartiles[col] = [(imputed_sketch.quantile(q) - means[col]) / scales[col] for q in (0.25, 0.75)]
+    logging.info(f"Statistics pass over {rows} rows completed: {len(num_cols)} numerical and {len(cat_cols)} categorical columns.")
+
+    scaled_kinds = {**kinds, **{col: "float" for col in num_cols}}
+    output_writer = ParquetChunkWriter(output_file_path, kinds)
+    numerical_writer = ParquetChunkWriter("DataPreparation/Visualizations/handling_numerical_data.parquet", scaled_kinds)
+    categorical_writer = ParquetChunkWriter("DataPreparation/Visualizations/handling_categorical_data.parquet", scaled_kinds)
+    scaled_writer = ParquetChunkWriter("DataPreparation/Visualizations/scaled_data.parquet", scaled_kinds)
+    deduplicator = RowDeduplicator()
+    outliers = {col: {'z_score_outliers': 0, 'iqr_outliers': 0} for col in num_cols}
+    with track("transform_pass", rows):
+        for chunk in iter_chunks(directory_path, chunk_size):
+            chunk = conform(prepare_chunk(chunk), kinds)
+            output_writer.write(deduplicator.filter(chunk))
+            chunk[num_cols] = chunk[num_cols].astype("float64").fillna(medians)
+            for col in cat_cols:
+                chunk[col] = chunk[col].fillna(fill_values[col])
+            numerical_writer.write(chunk[num_cols])
+            categorical_writer.write(chunk[cat_cols])
+            for col in num_cols:
+                chunk[col] = (chunk[col] - means[col]) / scales[col]
+                q1, q3 = quartiles[col]
+                iqr = q3 - q1
+                # The scaled column has mean 0 and std 1, so its z-score is the value itself
+                outliers[col]['z_score_outliers'] += int((chunk[col].abs() > 3).sum())
+                outliers[col]['iqr_outliers'] += int(((chunk[col] < q1 - 1.5 * iqr) | (chunk[col] > q3 + 1.5 * iqr)).sum())
+            scaled_writer.write(chunk)
+    written = output_writer.close()
+    numerical_writer.close()
+    categorical_writer.close()
+    scaled_writer.close()
+    logging.info(f"Data with duplicates removed saved as '{output_file_path}' ({written} of {rows} rows).")
+    logging.info("Imputed and scaled data saved as Parquet in DataPreparation/Visualizations.")
+    logging.info(f"Outlier detection completed: {outliers}")
+    logging.info("Sparse categorical encoding and EDA skipped in chunked mode.")
+    return outliers
+
+
+if chunk_size:
+    prepare_in_chunks("Staging/IN", f"Staging/OUT/telecom_customer_cleaned_dataset_{date_time}.parquet")
+    logging.info("Chunked data preprocessing and outlier detection completed successfully.")
+    sys.exit(0)
+
 # Load dataset
 dataset = read_all_csv_files("Staging/IN")
 logging.info("Datasets are merged into singel file loaded successfully.")
-dataset['tenureinmonths'] = dataset['tenureinmonths'].astype(int)
-# Calculate the customer joined date
-dataset['customer_joined_date'] = pd.to_datetime(dataset['ingestiondate']) - dataset['tenureinmonths'].apply(lambda x: relativedelta(months=x))
-drop_columns = ['tenureinmonths', 'totalcharges', 'totalrefunds', 'totalextradatacharges', 'totallongdistancecharges', 'totalrevenue']
-dataset = dataset.drop(columns=drop_columns)
+# Calculate the customer joined date and drop the columns it replaces, as the chunked path does
+dataset = prepare_chunk(dataset)
+# The joined date has always been an object column of Timestamps here, so it is still imputed and
+# encoded as a categorical column and written to CSV in the same format
+dataset['customer_joined_date'] = dataset['customer_joined_date'].astype(object)
 dataset_no_duplicates = dataset.drop_duplicates()
 
 # Save the resulting DataFrame to a new CSV file
 output_file_path = f"Staging/OUT/telecom_customer_cleaned_dataset_{date_time}.csv"
-dataset_no_duplicates.to_csv(output_file_path, index=False)
+with track("to_csv", len(dataset_no_duplicates)):
+    dataset_no_duplicates.to_csv(output_file_path, index=False)
 logging.info(f"Data with duplicates removed saved as '{output_file_path}'.")
 
 # Identify numerical and categorical columns
@@ -51,12 +154,17 @@ num_cols = dataset.select_dtypes(include=["number"]).columns.tolist()
 cat_cols = dataset.select_dtypes(include=["object", "category"]).columns.tolist()
 
 # Handle Missing Values
-num_imputer = SimpleImputer(strategy="median")
-dataset[num_cols] = num_imputer.fit_transform(dataset[num_cols])
+with track("impute_numerical", len(dataset)):
+    dataset[num_cols] = dataset[num_cols].astype("float64").fillna(dataset[num_cols].median())
 logging.info("Missing values in numerical columns handled using median imputation.")
 
-cat_imputer = SimpleImputer(strategy="most_frequent")
-dataset[cat_cols] = cat_imputer.fit_transform(dataset[cat_cols])
+with track("impute_categorical", len(dataset)):
+    for col in cat_cols:
+        # mode() is sorted, so ties go to the smallest value as with SimpleImputer(strategy="most_frequent")
+        mode = dataset[col].mode()
+        if not mode.empty:
+            # Assigning the imputer's object array back let pandas infer dtypes; infer_objects does the same
+            dataset[col] = dataset[col].where(dataset[col].notna(), mode.iloc[0]).infer_objects()
 logging.info("Missing values in categorical columns handled using mode imputation.")
 
 # Save intermediate result
@@ -65,10 +173,13 @@ dataset[cat_cols].to_csv("DataPreparation/Visualizations/handling_categorical_da
 logging.info("Imputed data saved as 'handling_numerical_data.csv' and 'handling_categorical_data.csv'.")
 logging.info("Imputation completed successfully.")
 
-# Standardize or Normalize Numerical Attributes
-scaler = StandardScaler()  # or MinMaxScaler()
-dataset[num_cols] = scaler.fit_transform(dataset[num_cols])
-logging.info("Numerical attributes standardized using StandardScaler.")
+# Standardize Numerical Attributes
+with track("fit_transform", len(dataset)):
+    # Population standard deviation and unit scale for constant columns, as StandardScaler does
+    scales = dataset[num_cols].std(ddof=0)
+    scales[scales <= 10 * np.finfo(float).eps] = 1.0
+    dataset[num_cols] = (dataset[num_cols] - dataset[num_cols].mean()) / scales
+logging.info("Numerical attributes standardized to zero mean and unit variance.")
 
 # Save intermediate result
 dataset.to_csv("DataPreparation/Visualizations/scaled_data.csv", index=False)
@@ -76,24 +187,31 @@ logging.info("Scaled data saved as 'scaled_data.csv'.")
 logging.info("Standardization completed successfully.")
 
 # Encode Categorical Variables
-# One-hot encoding
-dataset = pd.get_dummies(dataset, columns=cat_cols, drop_first=True)
-logging.info("Categorical variables one-hot encoded.")
+# One-hot encoding into a sparse matrix; identifier columns are skipped and high-cardinality ones hashed
+from scipy import sparse
+from sparseOneHot import SparseOneHot
+encoder = SparseOneHot()
+with track("encode_categorical", len(dataset)):
+    encoded_categorical = encoder.fit_transform(dataset)
+sparse.save_npz("DataPreparation/Visualizations/encoded_categorical_data.npz", encoded_categorical)
+logging.info(f"Categorical variables one-hot encoded into a sparse {encoded_categorical.shape} matrix "
+             f"({encoded_categorical.nnz} non-zeros, hashed columns: {encoder.hashed_columns_}).")
 
 # Label encoding for ordinal categories (if applicable)
 if 'ordinal_col' in dataset.columns:
+    from sklearn.preprocessing import LabelEncoder
     le = LabelEncoder()
     dataset['ordinal_col'] = le.fit_transform(dataset['ordinal_col'])
     logging.info("Ordinal column label encoded.")
     dataset['ordinal_col'].to_csv("DataPreparation/Visualizations/encoded_data.csv", index=False)
     logging.info("Encoded data saved as 'encoded_data.csv'.")
 
-dataset_outliers = dataset.copy()
+dataset_outliers = dataset[num_cols].copy()
 # Detect Outliers using Z-score and IQR
 outliers = {}
 for col in num_cols:
     # Z-score method
-    z_scores = np.abs(stats.zscore(dataset_outliers[col]))
+    z_scores = ((dataset_outliers[col] - dataset_outliers[col].mean()) / dataset_outliers[col].std(ddof=0)).abs()
     dataset_outliers[f'{col}_outlier_z'] = z_scores > 3
     
     # IQR method
@@ -112,29 +230,37 @@ logging.info(f"Outlier detection completed: {outliers}")
 
 
 # Exploratory Data Analysis (EDA)
+if run_eda:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-histogram_dir = "DataPreparation/Visualizations/Histograms"
-os.makedirs(histogram_dir, exist_ok=True)
-for col in num_cols:
-    plt.figure()
-    dataset_no_duplicates[col].hist(figsize=(10, 8), bins=30)
-    plt.title(f'Histogram of {col}')
-    hist_path = os.path.join(histogram_dir, f'{col}_histogram.png')
-    plt.savefig(hist_path)
-    plt.close()
-    logging.info(f"Histogram for {col} saved at {hist_path}")
+    histogram_dir = "DataPreparation/Visualizations/Histograms"
+    os.makedirs(histogram_dir, exist_ok=True)
+    for col in num_cols:
+        plt.figure()
+        dataset_no_duplicates[col].hist(figsize=(10, 8), bins=30)
+        plt.title(f'Histogram of {col}')
+        hist_path = os.path.join(histogram_dir, f'{col}_histogram.png')
+        plt.savefig(hist_path)
+        plt.close()
+        logging.debug("Histogram for %s saved at %s", col, hist_path)
 
 
-boxplot_dir = "DataPreparation/Visualizations/Boxplots"
-os.makedirs(boxplot_dir, exist_ok=True)
+    boxplot_dir = "DataPreparation/Visualizations/Boxplots"
+    os.makedirs(boxplot_dir, exist_ok=True)
 
-for col in num_cols:
-    plt.figure()
-    sns.boxplot(data=dataset_no_duplicates[[col]])
-    plt.title(f'Box plot of {col}')
-    boxplot_path = os.path.join(boxplot_dir, f'{col}_boxplot.png')
-    plt.savefig(boxplot_path)
-    plt.close()
-    logging.info(f"Box plot for {col} saved at {boxplot_path}")
+    for col in num_cols:
+        plt.figure()
+        sns.boxplot(data=dataset_no_duplicates[[col]])
+        plt.title(f'Box plot of {col}')
+        boxplot_path = os.path.join(boxplot_dir, f'{col}_boxplot.png')
+        plt.savefig(boxplot_path)
+        plt.close()
+        logging.debug("Box plot for %s saved at %s", col, boxplot_path)
+    logging.info("Histograms and box plots for %d columns saved under %s and %s", len(num_cols), histogram_dir, boxplot_dir)
+else:
+    logging.info("EDA skipped (SKIP_EDA=1).")
 
 logging.info("Data preprocessing, outlier detection, and EDA completed successfully.")
@@ -1,28 +1,36 @@
 import os
 import sys
 import pandas as pd
-import glob
+import numpy as np
 import logging
 sys.path.append(os.path.abspath("./Configurations"))
+sys.path.append(os.path.abspath("./Utilities"))
 import dbConfig as db
 import psycopg2
-from dateutil.relativedelta import relativedelta
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from instrumentation import init_stage, instrument, track
+from pipelineLogging import setup_logging
+from chunkedProcessing import chunk_size, staging_files
+
+# Set SKIP_DW_LOAD=1 to write the transformed files without loading them into the warehouse,
+# e.g. for benchmarks that have no scratch copy of the warehouse table
+skip_dw_load = os.environ.get("SKIP_DW_LOAD", "0") == "1"
 
 # Configure logging
 date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
-log_file = f'logs/dataTransforamtion_{date_time}.log'
-logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+setup_logging("dataTransformation")
+init_stage("dataTransformation")
 
 
 
+@instrument()
 def read_all_csv_files(directory_path):
     try:
         os.makedirs(directory_path, exist_ok=True)
-        all_files = glob.glob(os.path.join(directory_path, "*.csv"))
+        # DataPreparation writes Parquet in chunked mode, and housekeeping compacts older files into Parquet
+        all_files = staging_files(directory_path)
         df_list = []
         for file in all_files:
-            df = pd.read_csv(file)
+            df = pd.read_parquet(file) if file.endswith(".parquet") else pd.read_csv(file)
             df_list.append(df)
         combined_df = pd.concat(df_list, ignore_index=True)
         return combined_df
@@ -30,25 +38,88 @@ def read_all_csv_files(directory_path):
         print("Error in creating the directory")
 
 
-# Load dataset
-dataset = read_all_csv_files("Staging/OUT")
-# Calculate the customer tenure
-dataset['customer_tenure_months'] = dataset.apply(lambda row: (pd.to_datetime(row['ingestiondate']).year - pd.to_datetime(row['customer_joined_date']).year) * 12 + (pd.to_datetime(row['ingestiondate']).month - pd.to_datetime(row['customer_joined_date']).month), axis=1)
-# Create a column 'customers_all_type_services' based on the condition
-dataset['customers_all_type_services'] = dataset.apply(lambda row: row['phoneservice'] == 'Yes' and row['internetservice'] == 'Yes' and row['streamingtv'] == 'Yes', axis=1)
-dataset['total_spent_bycustomer_yearly'] = (dataset['monthlycharge'] + dataset['avgmonthlylongdistancecharges']) * 12
+def add_derived_columns(dataset):
+    ingestion = pd.to_datetime(dataset['ingestiondate'])
+    joined = pd.to_datetime(dataset['customer_joined_date'])
+    # Calculate the customer tenure
+    dataset['customer_tenure_months'] = ((ingestion.dt.year - joined.dt.year) * 12 + (ingestion.dt.month - joined.dt.month)).astype('int64')
+    # Create a column 'customers_all_type_services' based on the condition
+    dataset['customers_all_type_services'] = (dataset['phoneservice'] == 'Yes') & (dataset['internetservice'] == 'Yes') & (dataset['streamingtv'] == 'Yes')
+    dataset['total_spent_bycustomer_yearly'] = (dataset['monthlycharge'] + dataset['avgmonthlylongdistancecharges']) * 12
+    return dataset
+
+
+@instrument()
+def transform_in_chunks(directory_path, output_file_path):
+    """Out-of-core version of the scaling below for CHUNK_SIZE > 0.
+
+    StandardScaler followed by MinMaxScaler only needs each column's mean, variance, min and
+    max, so pass 1 merges those per chunk and pass 2 applies both scalings and streams the
+    chunks to Parquet.
+    """
+    from chunkedProcessing import iter_chunks, column_kind, merge_kind, RunningStats, ParquetChunkWriter
+    kinds, moments = {}, {}
+    with track("statistics_pass") as step:
+        rows = 0
+        for chunk in iter_chunks(directory_path, chunk_size):
+            chunk = add_derived_columns(chunk)
+            rows += len(chunk)
+            for col in chunk.columns:
+                kind = column_kind(chunk[col])
+                kinds[col] = merge_kind(kinds.get(col), kind)
+                if kind in ("int", "float"):
+                    moments.setdefault(col, RunningStats()).update(chunk[col])
+        step.rows_in = rows
+    num_cols = [col for col, kind in kinds.items() if kind in ("int", "float")]
+
+    # Same zero-variance and zero-range handling as the sklearn scalers
+    scales = {col: moments[col].std if moments[col].std > 10 * np.finfo(float).eps else 1.0 for col in num_cols}
+    lows = {col: (moments[col].min - moments[col].mean) / scales[col] for col in num_cols}
+    ranges = {col: (moments[col].max - moments[col].mean) / scales[col] - lows[col] for col in num_cols}
+    ranges = {col: value if value > 10 * np.finfo(float).eps else 1.0 for col, value in ranges.items()}
+
+    writer = ParquetChunkWriter(output_file_path, {**kinds, **{col: "float" for col in num_cols}})
+    with track("transform_pass", rows):
+        for chunk in iter_chunks(directory_path, chunk_size):
+            chunk = add_derived_columns(chunk)
+            for col in num_cols:
+                standardized = (pd.to_numeric(chunk[col], errors="coerce") - moments[col].mean) / scales[col]
+                chunk[col] = (standardized - lows[col]) / ranges[col]
+            writer.write(chunk)
+    written = writer.close()
+    logging.info(f"Transformed {written} rows in chunks of {chunk_size} to {output_file_path}")
+    return written
+
+
+if chunk_size:
+    output_file_path = f"Staging/Cleansed_data/Transformed_data_{date_time}.parquet"
+    transform_in_chunks("Staging/OUT", output_file_path)
+else:
+    # Load dataset
+    dataset = add_derived_columns(read_all_csv_files("Staging/OUT"))
+
+    num_cols = dataset.select_dtypes(include=["number"]).columns.tolist()
+    cat_cols = dataset.select_dtypes(include=["object", "category"]).columns.tolist()
 
-num_cols = dataset.select_dtypes(include=["number"]).columns.tolist()
-cat_cols = dataset.select_dtypes(include=["object", "category"]).columns.tolist()
+    # StandardScaler then MinMaxScaler as pandas arithmetic, with the same unit scale for
+    # constant columns as the chunked path, so the stage does not import sklearn
+    with track("fit_transform", len(dataset)):
+        eps = 10 * np.finfo(float).eps
+        scales = dataset[num_cols].std(ddof=0)
+        scales[scales <= eps] = 1.0
+        standardized = (dataset[num_cols] - dataset[num_cols].mean()) / scales
+        ranges = standardized.max() - standardized.min()
+        ranges[ranges <= eps] = 1.0
+        dataset[num_cols] = (standardized - standardized.min()) / ranges
 
-scalar = StandardScaler()
-normalization = MinMaxScaler()
-dataset[num_cols] = scalar.fit_transform(dataset[num_cols])
-dataset[num_cols] = normalization.fit_transform(dataset[num_cols])
+    # Save intermediate result
 
-# Save intermediate result
+    with track("to_csv", len(dataset)):
+        dataset.to_csv(f"Staging/Cleansed_data/Transformed_data_{date_time}.csv", index=False)
 
-dataset.to_csv(f"Staging/Cleansed_data/Transformed_data_{date_time}.csv", index=False)
+if skip_dw_load:
+    logging.info("Warehouse load skipped (SKIP_DW_LOAD=1).")
+    sys.exit(0)
 
 # Database session establishment
 try:
@@ -59,7 +130,9 @@ try:
 except:
     print("Error in connecting to the database")
     logging.error("Error in connecting to the database")
+    sys.exit(1)
 
+@instrument()
 def insert_data(tablename, dataset):
     try:
         for index, row in dataset.iterrows():
@@ -71,11 +144,20 @@ def insert_data(tablename, dataset):
         connection.commit()
         print("Data is inserted into table!")
         logging.info("Data is inserted into table!")
+        return True
     except Exception as e:
         print(f"Error in inserting the data: {e}")
         logging.error(f"Error in inserting the data: {e}")
+        return False
 
-insert_data(db.dw_tablename, dataset)
+if chunk_size:
+    from chunkedProcessing import iter_file_chunks
+    loaded = all([insert_data(db.dw_tablename, chunk) for chunk in iter_file_chunks(output_file_path)])
+else:
+    loaded = insert_data(db.dw_tablename, dataset)
 logging.info("------------------Part 2 DataIngestion completed------------------")
 cursor.close()
 connection.close()
+# The warehouse load is this stage's main effect; a non-zero exit keeps a failed load out of the stage cache
+if not loaded:
+    sys.exit(1)
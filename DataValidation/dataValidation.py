@@ -1,46 +1,23 @@
 import pandas as pd
 import logging
 import os
+import sys
 import glob
+sys.path.append(os.path.abspath("./Configurations"))
+sys.path.append(os.path.abspath("./Utilities"))
+from schemaConfig import expected_schema
+from instrumentation import init_stage, instrument, track
+from pipelineLogging import setup_logging, FramePreview
 
 # === Configuration ===
 
 # Logging configuration
 date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
-log_file = f'logs/dataValidation_{date_time}.log'
-logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s') 
+setup_logging("dataValidation")
+init_stage("dataValidation")
 
 report_output = f'DataValidation/validation_report_{date_time}.csv'  
 
-# Expected schema: column -> expected type
-expected_schema = {
-    'customerid': 'object', 'gender': 'object', 'age': 'int64', 
-    'under30': 'object', 'seniorcitizen': 'object', 'married': 'object', 
-    'dependents': 'object', 'numberofdependents': 'int64', 
-    'country': 'object', 'state': 'object', 'city': 'object', 
-    'zipcode': 'object', 'latitude': 'float64', 'longitude': 'float64', 
-    'population': 'int64', 'quarter': 'object', 'referredafriend': 'object', 
-    'numberofreferrals': 'int64', 'tenureinmonths': 'int64', 
-    'offer': 'object', 'phoneservice': 'object', 
-    'avgmonthlylongdistancecharges': 'float64', 'multiplelines': 'object', 
-    'internetservice': 'object', 'internettype': 'object', 
-    'avgmonthlygbdownload': 'float64', 'onlinesecurity': 'object', 
-    'onlinebackup': 'object', 'deviceprotectionplan': 'object', 
-    'premiumtechsupport': 'object', 'streamingtv': 'object', 
-    'streamingmovies': 'object', 'streamingmusic': 'object', 
-    'unlimiteddata': 'object', 'contract': 'object', 
-    'paperlessbilling': 'object', 'paymentmethod': 'object', 
-    'monthlycharge': 'float64', 'totalcharges': 'float64', 
-    'totalrefunds': 'float64', 'totalextradatacharges': 'float64', 
-    'totallongdistancecharges': 'float64', 'totalrevenue': 'float64', 
-    'satisfactionscore': 'int64', 'customerstatus': 'object', 
-    'churnlabel': 'object', 'churnscore': 'int64', 'cltv': 'int64', 
-    'churncategory': 'object', 'churnreason': 'object', 
-    'ingestiondate': 'object'
-}
-
-
-
 
 def detect_format(column):
     if column.dtype == 'object':
@@ -51,6 +28,7 @@ def detect_format(column):
 
 
 # === Schema Validation Logic ===
+@instrument()
 def validation(df, expected_schema, report_output):
     for column, expected_type in expected_schema.items():
         if column in df.columns:
@@ -88,26 +66,30 @@ def validation(df, expected_schema, report_output):
                 'Percent Missing': f"{percent_missing:.2f}%",
                 'Inconsistent Values': inconsistant,
             })
-            logging.info(f"Column {column} validation results are added as a row into the report {report_output}")
+            logging.debug("Column %s validation results are added as a row into the report %s", column, report_output)
+    logging.info("Validation results for %d columns are added into the report %s", len(expected_schema), report_output)
 
 
+@instrument()
 def read_all_csv_files(directory_path):
     try:
         os.makedirs(directory_path, exist_ok=True)
-        all_files = glob.glob(os.path.join(directory_path, "*.csv"))
+        # Housekeeping compacts older hourly files into Parquet partitions
+        all_files = glob.glob(os.path.join(directory_path, "*.csv")) + glob.glob(os.path.join(directory_path, "*.parquet"))
         df_list = []
         for file in all_files:
-            df = pd.read_csv(file)
+            df = pd.read_parquet(file) if file.endswith(".parquet") else pd.read_csv(file)
             df_list.append(df)
         combined_df = pd.concat(df_list, ignore_index=True)
         return combined_df
     except:
         print("Error in creating the directory")
 
+@instrument()
 def identify_duplicates(df):
     try:
         duplicates = df[df.duplicated()]
-        logging.info(f"Duplicate records:\n{duplicates}")
+        logging.info("Duplicate records (%d):\n%s", len(duplicates), FramePreview(duplicates))
         return duplicates
     except:
         logging.error("Error in identifying duplicates")
@@ -120,5 +102,6 @@ report = []
 validation(df, expected_schema, report_output)
 identify_duplicates(df)
 report_df = pd.DataFrame(report)
-report_df.to_csv(report_output, index=False)
+with track("report_to_csv", len(report_df)):
+    report_df.to_csv(report_output, index=False)
 logging.info(f"Report is exported to {report_output}")
\ No newline at end of file
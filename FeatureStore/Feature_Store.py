@@ -4,13 +4,14 @@ import os
 import logging
 import sys
 import glob
-from feast import FeatureStore
-from feast.infra.offline_stores.file_source import SavedDatasetFileStorage
+sys.path.append(os.path.abspath("./Utilities"))
+from instrumentation import init_stage, instrument, track
+from pipelineLogging import setup_logging
 
 # Logging configuration
 date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
-log_file = f'logs/feature_Store_{date_time}.log'
-logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+setup_logging("featureStore")
+init_stage("featureStore")
 
 def initiate_feature_store():
     # Ensure Feast is installed and initialized before running this script
@@ -18,13 +19,15 @@ def initiate_feature_store():
     # Initialize Feast repository
     subprocess.run(["feast", "init", "-m", "feature_repo"], cwd=".")   
     logging.info("Feature Store initiated")  
+@instrument()
 def read_all_csv_files(directory_path):
     try:
         os.makedirs(directory_path, exist_ok=True)
-        all_files = glob.glob(os.path.join(directory_path, "*.csv"))
+        # dataTransformation writes Parquet in chunked mode, and housekeeping compacts older files into Parquet
+        all_files = glob.glob(os.path.join(directory_path, "*.csv")) + glob.glob(os.path.join(directory_path, "*.parquet"))
         df_list = []
         for file in all_files:
-            df = pd.read_csv(file)
+            df = pd.read_parquet(file) if file.endswith(".parquet") else pd.read_csv(file)
             df_list.append(df)
         combined_df = pd.concat(df_list, ignore_index=True)
         return combined_df
@@ -51,14 +54,17 @@ def getTransformedData():
     predictors_df = pd.concat(objs=[predictors_df, customer_ids], axis=1)
     target_df = pd.concat(objs=[target_df, customer_ids], axis=1)
      
-    predictors_df.to_parquet(path='FeatureStore/feature_repo/feature_repo/data/predictors_df.parquet')
-    target_df.to_parquet(path='FeatureStore/feature_repo/feature_repo/data/target_df.parquet')
+    with track("to_parquet", len(predictors_df)):
+        predictors_df.to_parquet(path='FeatureStore/feature_repo/feature_repo/data/predictors_df.parquet')
+        target_df.to_parquet(path='FeatureStore/feature_repo/feature_repo/data/target_df.parquet')
     
     #print(predictors_df.describe())
     logging.info("Transformed data loaded")  
  
  
+@instrument()
 def historicalFeaturesFromFeatureStore():
+    from feast import FeatureStore
     # Initialize FeatureStore
     store = FeatureStore(repo_path='FeatureStore/feature_repo/feature_repo')
     # Read entity DataFrame from a Parquet file
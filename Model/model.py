@@ -3,27 +3,34 @@ from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
-import joblib
 import os
+import sys
 import logging
 import glob
-from datetime import datetime
+sys.path.append(os.path.abspath("./Model"))
+sys.path.append(os.path.abspath("./Utilities"))
+import modelRegistry as registry
+from categoricalEncoder import CategoricalEncoder, id_columns
+from instrumentation import init_stage, instrument, track
+from pipelineLogging import setup_logging
 
 # Logging configuration
 date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
-log_file = f'logs/model_{date_time}.log'
-logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+setup_logging("model")
+init_stage("model")
 
+@instrument()
 def read_all_csv_files(directory_path):
     try:
         os.makedirs(directory_path, exist_ok=True)
-        all_files = glob.glob(os.path.join(directory_path, "*.csv"))
+        # Housekeeping compacts older hourly files into Parquet partitions
+        all_files = glob.glob(os.path.join(directory_path, "*.csv")) + glob.glob(os.path.join(directory_path, "*.parquet"))
         df_list = []
         for file in all_files:
-            df = pd.read_csv(file)
+            df = pd.read_parquet(file) if file.endswith(".parquet") else pd.read_csv(file)
             df_list.append(df)
         combined_df = pd.concat(df_list, ignore_index=True)
         return combined_df
@@ -44,15 +51,18 @@ else:
 y = df["churnlabel"]
 
 
-# Identify categorical features
-categorical_features = X.select_dtypes(include=['object']).columns.tolist()
+# Identify categorical and numerical features, leaving out identifier columns
+categorical_features = [col for col in X.select_dtypes(include=['object']).columns if col not in id_columns]
+numerical_features = [col for col in X.select_dtypes(include=['number', 'bool']).columns if col not in id_columns]
 
-# Create a column transformer with one-hot encoding for categorical features
+# Create a column transformer with sparse one-hot encoding for categorical features
 preprocessor = ColumnTransformer(
     transformers=[
-        ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
+        ('cat', CategoricalEncoder(columns=categorical_features), categorical_features),
+        ('num', SimpleImputer(strategy='median'), numerical_features)
     ],
-    remainder='passthrough'
+    remainder='drop',
+    sparse_threshold=1.0
 )
 
 
@@ -69,8 +79,10 @@ model_performance = {}
 
 # 5. Train and evaluate models
 for name, model in models.items():
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
+    with track("fit", len(X_train), model=name):
+        model.fit(X_train, y_train)
+    with track("predict", len(X_test), model=name):
+        y_pred = model.predict(X_test)
 
     accuracy = accuracy_score(y_test, y_pred)
     precision = precision_score(y_test, y_pred, pos_label='Yes')
@@ -97,13 +109,10 @@ logging.info(f"Best model selected: {best_model_name}")
 best_model = model_performance[best_model_name]["model"]
 logging.info(f"Best model performance: {model_performance[best_model_name]}")
 
-# Create versioned model filename
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-model_dir = "Model"
-os.makedirs(model_dir, exist_ok=True)
-model_filename = f"{model_dir}/churn_model_{best_model_name}_{timestamp}.joblib"
-logging.info(f"Saving best model as: {model_filename}")
-
-joblib.dump(best_model, model_filename)
+# Register the versioned model with its metrics and training-data hash
+best_metrics = {k: v for k, v in model_performance[best_model_name].items() if k != "model"}
+with track("register_model", model=best_model_name):
+    model_filename = registry.register_model(best_model, best_model_name, best_metrics, registry.hash_dataframe(df))
 logging.info(f"\n Best model ({best_model_name}) saved as: {model_filename}")
+registry.apply_retention()
 logging.info("Model training completed")
\ No newline at end of file
@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+import joblib
+import pandas as pd
+# Pipelines pickle a reference to the shared encoder module, so it must be importable on load
+sys.path.append(os.path.abspath("./Utilities"))
+from pipelineLogging import setup_logging
+
+registry_db = "Model/registry.db"
+model_dir = "Model"
+compress_level = 3
+keep_last = 5
+
+
+def get_connection(db_path=registry_db):
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    connection.execute("""CREATE TABLE IF NOT EXISTS models (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        path TEXT NOT NULL UNIQUE,
+        created_at TEXT NOT NULL,
+        metrics TEXT NOT NULL,
+        data_hash TEXT,
+        compress INTEGER NOT NULL,
+        size_bytes INTEGER NOT NULL)""")
+    connection.execute("CREATE INDEX IF NOT EXISTS models_name_created ON models (name, created_at)")
+    return connection
+
+
+def hash_dataframe(df):
+    # Row-wise hashes are order sensitive, so the same rows in the same order give the same digest
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    column_hash = hashlib.sha256(",".join(map(str, df.columns)).encode()).hexdigest()
+    return hashlib.sha256(row_hashes.tobytes() + column_hash.encode()).hexdigest()
+
+
+def save_artifact(model, path, compress=compress_level):
+    joblib.dump(model, path, compress=compress)
+    return os.path.getsize(path)
+
+
+def load_artifact(path, compress=None):
+    # joblib can only memory-map arrays of uncompressed artifacts
+    if compress == 0:
+        return joblib.load(path, mmap_mode="r")
+    return joblib.load(path)
+
+
+def register_model(model, name, metrics, data_hash=None, compress=compress_level, directory_path=model_dir, db_path=registry_db):
+    os.makedirs(directory_path, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = f"{directory_path}/churn_model_{name}_{timestamp}.joblib"
+    size_bytes = save_artifact(model, path, compress)
+    connection = get_connection(db_path)
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO models (name, path, created_at, metrics, data_hash, compress, size_bytes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, path, datetime.now().isoformat(), json.dumps(metrics), data_hash, compress, size_bytes),
+        )
+    connection.close()
+    logging.info("Model %s registered at %s (%d bytes, compress=%s)", name, path, size_bytes, compress)
+    return path
+
+
+def to_entry(row):
+    if row is None:
+        return None
+    entry = dict(row)
+    entry["metrics"] = json.loads(entry["metrics"])
+    return entry
+
+
+def get_latest(name=None, db_path=registry_db):
+    if not os.path.exists(db_path):
+        return None
+    connection = get_connection(db_path)
+    if name is None:
+        row = connection.execute("SELECT * FROM models ORDER BY created_at DESC, id DESC LIMIT 1").fetchone()
+    else:
+        row = connection.execute("SELECT * FROM models WHERE name = ? ORDER BY created_at DESC, id DESC LIMIT 1", (name,)).fetchone()
+    connection.close()
+    return to_entry(row)
+
+
+def get_best(metric="f1_score", name=None, db_path=registry_db):
+    if not os.path.exists(db_path):
+        return None
+    connection = get_connection(db_path)
+    query = "SELECT * FROM models WHERE json_extract(metrics, ?) IS NOT NULL"
+    params = [f"$.{metric}"]
+    if name is not None:
+        query += " AND name = ?"
+        params.append(name)
+    query += " ORDER BY json_extract(metrics, ?) DESC, created_at DESC LIMIT 1"
+    params.append(f"$.{metric}")
+    row = connection.execute(query, params).fetchone()
+    connection.close()
+    return to_entry(row)
+
+
+def list_models(db_path=registry_db):
+    if not os.path.exists(db_path):
+        return []
+    connection = get_connection(db_path)
+    rows = connection.execute("SELECT * FROM models ORDER BY created_at DESC, id DESC").fetchall()
+    connection.close()
+    return [to_entry(row) for row in rows]
+
+
+def apply_retention(keep_last=keep_last, metric="f1_score", db_path=registry_db):
+    """Deletes all but the newest keep_last artifacts per model name, always keeping the best one."""
+    entries = list_models(db_path)
+    best = get_best(metric, db_path=db_path)
+    kept_per_name = {}
+    removed = []
+    for entry in entries:
+        kept = kept_per_name.get(entry["name"], 0)
+        if kept < keep_last or (best is not None and entry["id"] == best["id"]):
+            kept_per_name[entry["name"]] = kept + 1
+            continue
+        removed.append(entry)
+    connection = get_connection(db_path)
+    with connection:
+        for entry in removed:
+            if os.path.exists(entry["path"]):
+                os.remove(entry["path"])
+            connection.execute("DELETE FROM models WHERE id = ?", (entry["id"],))
+    connection.close()
+    reclaimed = sum(entry["size_bytes"] for entry in removed)
+    logging.info("Retention removed %d model artifacts, reclaimed %d bytes", len(removed), reclaimed)
+    return removed
+
+
+def benchmark_artifact(model, compress_levels=(0, 3, 9), repeats=5):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for compress in compress_levels:
+            path = os.path.join(tmp_dir, f"model_{compress}.joblib")
+            start = time.perf_counter()
+            size_bytes = save_artifact(model, path, compress)
+            dump_seconds = time.perf_counter() - start
+            load_times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                load_artifact(path, compress)
+                load_times.append(time.perf_counter() - start)
+            results.append({
+                "compress": compress,
+                "mmap": compress == 0,
+                "size_bytes": size_bytes,
+                "dump_seconds": dump_seconds,
+                "load_seconds": min(load_times),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+    setup_logging("modelRegistry", log_file=f'logs/modelRegistry_{date_time}.log')
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "list":
+        for entry in list_models():
+            print(f"{entry['created_at']}  {entry['name']:<20} {entry['size_bytes']:>12} bytes  {entry['metrics']}  {entry['path']}")
+    elif command == "retain":
+        removed = apply_retention(int(sys.argv[2]) if len(sys.argv) > 2 else keep_last)
+        print(f"Removed {len(removed)} model artifacts")
+    elif command == "benchmark":
+        entry = get_best() or get_latest()
+        if entry is None:
+            print("No registered model to benchmark")
+        else:
+            model = load_artifact(entry["path"], entry["compress"])
+            for result in benchmark_artifact(model):
+                print(f"compress={result['compress']} mmap={result['mmap']!s:<5} size={result['size_bytes']:>12} bytes "
+                      f"dump={result['dump_seconds']:.3f}s load={result['load_seconds'] * 1000:.1f}ms")
+                logging.info("Artifact benchmark for %s: %s", entry["path"], result)
+    else:
+        print("Usage: python Model/modelRegistry.py [list|retain [keep_last]|benchmark]")
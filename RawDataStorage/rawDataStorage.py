@@ -1,15 +1,18 @@
 import sys
 import os
 sys.path.append(os.path.abspath("./Configurations"))
+sys.path.append(os.path.abspath("./Utilities"))
 import dbConfig as db
 import psycopg2
 import pandas as pd
 import logging
+from instrumentation import init_stage, instrument
+from pipelineLogging import setup_logging
 
 # Logging configuration
 date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
-log_file = f'logs/rawDataStorage_{date_time}.log'
-logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
+setup_logging("rawDataStorage")
+init_stage("rawDataStorage")
 
 # Database session establishment
 try:
@@ -21,6 +24,7 @@ except:
     print("Error in connecting to the database")
     logging.error("Error in connecting to the database")
 
+@instrument()
 def read_tabledata(table_name):
     try:
         query = f"SELECT * FROM {table_name}"
@@ -31,6 +35,7 @@ def read_tabledata(table_name):
         print("Error in reading the table data")
         logging.error("Error in reading the table data")
 
+@instrument()
 def save_table_to_csv(table_name, csv_file_path):
     try:
         query = f"COPY (SELECT * FROM {table_name} WHERE ingestiondate = CURRENT_DATE) TO STDOUT WITH CSV HEADER"
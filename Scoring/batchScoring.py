@@ -0,0 +1,100 @@
+import os
+import sys
+import glob
+import time
+import logging
+import pandas as pd
+sys.path.append(os.path.abspath("./Scoring"))
+sys.path.append(os.path.abspath("./Utilities"))
+from churnScorer import ModelLoader, score_dataframe
+from pipelineLogging import setup_logging
+
+date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+
+chunk_size = 50000
+output_dir = "Scoring/Predictions"
+
+
+def iter_chunks(input_path, chunk_size=chunk_size):
+    if input_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+            yield chunk
+
+
+class PredictionWriter:
+    """Appends scored chunks to a CSV or Parquet file without holding them in memory."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.parquet_writer = None
+        self.header = True
+
+    def write(self, result):
+        if self.output_path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            result.to_csv(self.output_path, mode="w" if self.header else "a", header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def score_file(loader, input_path, output_path, chunk_size=chunk_size, id_column="customerid"):
+    rows = 0
+    start = time.perf_counter()
+    # One model per file, so a retrain mid-run cannot mix two models in one predictions file;
+    # the loader re-checks Model/ on the next file
+    model = loader.get_model()
+    if model is None:
+        raise RuntimeError("No model available for scoring")
+    model_path = loader.model_path
+    writer = PredictionWriter(output_path)
+    try:
+        for chunk in iter_chunks(input_path, chunk_size):
+            writer.write(score_dataframe(model, chunk, id_column))
+            rows += len(chunk)
+            logging.info("Scored %d rows from %s with %s", rows, input_path, model_path)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    logging.info("Scored %d rows in %.2fs (%.0f rows/s) with %s, saved to %s", rows, elapsed, rows / max(elapsed, 1e-9), model_path, output_path)
+    return rows, elapsed
+
+
+def latest_input_file(directory_path="Outputfiles"):
+    all_files = glob.glob(os.path.join(directory_path, "*.csv"))
+    if not all_files:
+        return None
+    return max(all_files, key=os.path.getmtime)
+
+
+if __name__ == "__main__":
+    # Configured here rather than on import, so scripts that import this module keep their own log
+    setup_logging("batchScoring", log_file=f'logs/batchScoring_{date_time}.log')
+    logging.info("------------------BatchScoring script started------------------")
+    input_path = sys.argv[1] if len(sys.argv) > 1 else latest_input_file()
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = sys.argv[2] if len(sys.argv) > 2 else f"{output_dir}/churn_predictions_{date_time}.csv"
+    if input_path is None:
+        print("No input file found for scoring")
+        logging.error("No input file found for scoring")
+    else:
+        try:
+            rows, elapsed = score_file(ModelLoader(), input_path, output_path)
+            print(f"Scored {rows} rows in {elapsed:.2f}s, predictions saved to {output_path}")
+        except Exception as e:
+            print(f"Error in batch scoring: {e}")
+            logging.error("Error in batch scoring: %s", e)
+    logging.info("------------------BatchScoring script completed------------------")
@@ -0,0 +1,101 @@
+import os
+import sys
+import glob
+import time
+import logging
+import threading
+import pandas as pd
+sys.path.append(os.path.abspath("./Model"))
+import modelRegistry as registry
+
+model_dir = "Model"
+model_pattern = "churn_model_*.joblib"
+target_column = "churnlabel"
+positive_label = "Yes"
+
+
+def find_latest_model(directory_path=model_dir):
+    # Prefer the registry index; artifacts saved before it existed are still found by globbing
+    entry = registry.get_latest(db_path=os.path.join(directory_path, "registry.db"))
+    if entry is not None and os.path.exists(entry["path"]):
+        return entry["path"], entry["compress"]
+    all_files = glob.glob(os.path.join(directory_path, model_pattern))
+    if not all_files:
+        return None, None
+    return max(all_files, key=os.path.getmtime), None
+
+
+class ModelLoader:
+    """Keeps the newest churn model in memory and swaps it when a newer artifact is saved."""
+
+    def __init__(self, directory_path=model_dir, check_interval=30):
+        self.directory_path = directory_path
+        self.check_interval = check_interval
+        self.model = None
+        self.model_path = None
+        self.model_mtime = None
+        self.last_check = 0.0
+        self.lock = threading.Lock()
+
+    def get_model(self):
+        if self.model is None or time.monotonic() - self.last_check >= self.check_interval:
+            self.refresh()
+        return self.model
+
+    def refresh(self):
+        with self.lock:
+            self.last_check = time.monotonic()
+            latest, compress = find_latest_model(self.directory_path)
+            if latest is None:
+                logging.error("No model artifact found in %s", self.directory_path)
+                return self.model
+            mtime = os.path.getmtime(latest)
+            if latest == self.model_path and mtime == self.model_mtime:
+                return self.model
+            try:
+                start = time.perf_counter()
+                model = registry.load_artifact(latest, compress)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                # Keep serving the previous model if the new artifact cannot be loaded
+                print(f"Error in loading the model {latest}: {e}")
+                logging.error("Error in loading the model %s: %s", latest, e)
+                return self.model
+            self.model, self.model_path, self.model_mtime = model, latest, mtime
+            logging.info("Model %s loaded in %.3fs", latest, elapsed)
+            return self.model
+
+
+def categorical_columns(model):
+    steps = getattr(model, "named_steps", {})
+    preprocessor = steps.get("preprocessor")
+    if preprocessor is None or not hasattr(preprocessor, "transformers_"):
+        return []
+    return [col for name, _, cols in preprocessor.transformers_ if name == "cat" for col in cols]
+
+
+def prepare_features(model, df):
+    features = df.drop(columns=[target_column], errors="ignore")
+    # Align with the columns the pipeline was fitted on; missing ones are scored as NaN
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is not None:
+        features = features.reindex(columns=list(feature_names))
+    # A chunk where a categorical column is entirely empty is read back as float
+    cat_cols = [col for col in categorical_columns(model) if col in features.columns]
+    if cat_cols:
+        features[cat_cols] = features[cat_cols].astype(object)
+    return features
+
+
+def score_dataframe(model, df, id_column="customerid"):
+    features = prepare_features(model, df)
+    result = pd.DataFrame(index=df.index)
+    if id_column in df.columns:
+        result[id_column] = df[id_column]
+    result["prediction"] = model.predict(features)
+    if hasattr(model, "predict_proba"):
+        probabilities = model.predict_proba(features)
+        classes = list(model.classes_)
+        positive_index = classes.index(positive_label) if positive_label in classes else len(classes) - 1
+        result["churn_probability"] = probabilities[:, positive_index]
+    return result
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import asyncio
+import logging
+import pandas as pd
+sys.path.append(os.path.abspath("./Scoring"))
+sys.path.append(os.path.abspath("./Utilities"))
+from churnScorer import ModelLoader, score_dataframe
+from pipelineLogging import setup_logging
+
+date_time = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+
+host = "127.0.0.1"
+port = 8080
+max_batch_size = 64
+max_wait_ms = 10
+
+status_text = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """Collects concurrent requests and scores them as one frame, flushing on size or timeout."""
+
+    def __init__(self, loader, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms):
+        self.loader = loader
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, records):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            await self.flush(batch)
+
+    def score(self, frame):
+        model = self.loader.get_model()
+        if model is None:
+            raise RuntimeError("No model available for scoring")
+        return score_dataframe(model, frame)
+
+    async def flush(self, batch):
+        # Any error here fails the batch's requests, never the run() loop that later requests wait on
+        try:
+            frame = pd.DataFrame([record for records, _ in batch for record in records])
+            result = await asyncio.get_running_loop().run_in_executor(None, self.score, frame)
+        except Exception as e:
+            logging.error("Error in scoring batch of %d requests: %s", len(batch), e)
+            if len(batch) > 1:
+                # Re-score each request on its own so a bad record only fails the client that sent it
+                for item in batch:
+                    await self.flush([item])
+            else:
+                self.fail(batch, e)
+            return
+        try:
+            self.batches += 1
+            self.rows += len(frame)
+            offset = 0
+            for records, future in batch:
+                if not future.done():
+                    future.set_result(result.iloc[offset:offset + len(records)].to_dict("records"))
+                offset += len(records)
+        except Exception as e:
+            logging.error("Error in returning a batch of %d requests: %s", len(batch), e)
+            self.fail(batch, e)
+
+    @staticmethod
+    def fail(batch, error):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, value = line.decode("latin-1").split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, headers, body
+
+
+def make_handler(batcher):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    status, payload, keep_alive = 400, {"error": "Malformed request"}, False
+                else:
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                    status, payload = await dispatch(batcher, method, path, body)
+                data = json.dumps(payload, default=str).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {status_text[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return handle_connection
+
+
+async def dispatch(batcher, method, path, body):
+    if method == "GET" and path == "/health":
+        return 200, {"status": "ok", "model": batcher.loader.model_path, "batches": batcher.batches, "rows": batcher.rows}
+    if method == "POST" and path == "/predict":
+        try:
+            records = json.loads(body)
+        except ValueError:
+            return 400, {"error": "Body must be JSON"}
+        if isinstance(records, dict):
+            records = [records]
+        if not isinstance(records, list) or not records or not all(isinstance(record, dict) for record in records):
+            return 400, {"error": "Body must be a record or a non-empty list of records"}
+        try:
+            return 200, {"predictions": await batcher.submit(records)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+    return 404, {"error": f"No route for {method} {path}"}
+
+
+async def start_service(loader, host=host, port=port, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms):
+    batcher = MicroBatcher(loader, max_batch_size, max_wait_ms)
+    batcher_task = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(make_handler(batcher), host, port)
+    logging.info("Scoring service listening on %s:%d", host, server.sockets[0].getsockname()[1])
+    return server, batcher, batcher_task
+
+
+async def main():
+    loader = ModelLoader()
+    if loader.get_model() is None:
+        print("No model available, the service will retry on each batch")
+    server, _, _ = await start_service(loader, host, port)
+    print(f"Scoring service listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    # Configured here rather than on import, so scripts that import this module keep their own log
+    setup_logging("scoringService", log_file=f'logs/scoringService_{date_time}.log')
+    logging.info("------------------ScoringService started------------------")
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    logging.info("------------------ScoringService stopped------------------")
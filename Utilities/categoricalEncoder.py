@@ -0,0 +1,9 @@
+from sklearn.base import BaseEstimator, TransformerMixin
+from sparseOneHot import SparseOneHot, id_columns, other_category, stable_hash
+
+
+class CategoricalEncoder(SparseOneHot, TransformerMixin, BaseEstimator):
+    """SparseOneHot as an sklearn estimator, for ColumnTransformer pipelines and cloning.
+
+    Stages that only encode a frame use SparseOneHot directly and do not import sklearn.
+    """
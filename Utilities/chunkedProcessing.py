@@ -0,0 +1,286 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+
+# Set CHUNK_SIZE to a row count to run DataPreparation and dataTransformation out of core:
+# one pass accumulates the statistics below, a second pass transforms chunk by chunk to Parquet
+chunk_size = int(os.environ.get("CHUNK_SIZE", "0"))
+
+
+def staging_files(directory_path):
+    return sorted(glob.glob(os.path.join(directory_path, "*.csv")) + glob.glob(os.path.join(directory_path, "*.parquet")))
+
+
+def iter_file_chunks(path, size=None):
+    size = size or chunk_size
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=size)
+
+
+def iter_chunks(directory_path, size=None):
+    """Yields DataFrames of at most size rows from every CSV and Parquet file in a directory."""
+    for path in staging_files(directory_path):
+        yield from iter_file_chunks(path, size)
+
+
+def read_all_files(directory_path):
+    """In-memory counterpart of iter_chunks, for readers downstream of a chunked stage."""
+    frames = [pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path) for path in staging_files(directory_path)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def column_kind(series):
+    if series.dtype.kind in "iu":
+        return "int"
+    if series.dtype.kind == "f":
+        # read_csv gives all-empty columns float64 whatever they hold in other chunks
+        return "float" if series.notna().any() else "null"
+    if series.dtype.kind == "b":
+        return "bool"
+    if series.dtype.kind == "M":
+        return "datetime"
+    return "string"
+
+
+def merge_kind(left, right):
+    """Mirrors how pd.concat would combine the dtypes of the same column from two chunks."""
+    if left is None or left == right:
+        return right
+    if "null" in (left, right):
+        other = right if left == "null" else left
+        return "float" if other == "int" else other
+    if {left, right} == {"int", "float"}:
+        return "float"
+    return "string"
+
+
+def conform(chunk, kinds):
+    """Casts a chunk to the column kinds seen over the whole input so every Parquet row group shares one schema."""
+    chunk = chunk.copy()
+    for column in chunk.columns:
+        kind, values = kinds[column], chunk[column]
+        if kind in ("float", "null"):
+            chunk[column] = pd.to_numeric(values, errors="coerce").astype("float64")
+        elif kind == "int":
+            chunk[column] = values.astype("int64")
+        elif kind == "datetime":
+            chunk[column] = pd.to_datetime(values)
+        elif kind == "string" and pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+            chunk[column] = values.astype(object).where(values.notna(), None).map(lambda v: v if v is None else str(v))
+    return chunk
+
+
+class RunningStats:
+    """Count, mean, variance (Chan et al. pairwise merge), min and max of one column, NaNs ignored."""
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        present = values[~np.isnan(values)]
+        self.nulls += len(values) - len(present)
+        if len(present):
+            other = RunningStats()
+            other.count = len(present)
+            other.mean = float(present.mean())
+            other.m2 = float(((present - other.mean) ** 2).sum())
+            other.min = float(present.min())
+            other.max = float(present.max())
+            self.merge(other)
+        return self
+
+    def add_constant(self, value, count):
+        """Folds in count copies of value, e.g. the median that imputation writes into the nulls."""
+        if count:
+            other = RunningStats()
+            other.count, other.mean, other.min, other.max = count, float(value), float(value), float(value)
+            self.merge(other)
+        return self
+
+    def merge(self, other):
+        total = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count = total
+        self.nulls += other.nulls
+        return self
+
+    @property
+    def var(self):
+        # Population variance, as StandardScaler and scipy.stats.zscore use
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.var))
+
+
+class QuantileSketch:
+    """Mergeable weighted-value sketch for medians and quartiles.
+
+    Exact (pandas' linear interpolation) while a column has at most max_values distinct values,
+    which covers every numeric column of the telco data; beyond that neighbouring values are
+    merged into weighted centroids and quantiles become approximate.
+    """
+
+    def __init__(self, max_values=50000):
+        self.max_values = max_values
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        counts = pd.Series(values[~np.isnan(values)]).value_counts()
+        self._absorb(counts.index.to_numpy(dtype="float64"), counts.to_numpy(dtype="float64"))
+        return self
+
+    def add_constant(self, value, count):
+        if count:
+            self._absorb(np.array([float(value)]), np.array([float(count)]))
+        return self
+
+    def merge(self, other):
+        self._absorb(other.values, other.weights)
+        return self
+
+    def _absorb(self, values, weights):
+        combined = pd.Series(np.concatenate([self.weights, weights]), index=np.concatenate([self.values, values])).groupby(level=0).sum()
+        self.values = combined.index.to_numpy(dtype="float64")
+        self.weights = combined.to_numpy(dtype="float64")
+        if len(self.values) > self.max_values:
+            self._compress()
+
+    def _compress(self):
+        # Equal-weight buckets over the sorted values, each replaced by its weighted mean
+        cumulative = np.cumsum(self.weights)
+        bucket = np.minimum((cumulative - self.weights / 2) / cumulative[-1] * (self.max_values // 2), self.max_values // 2 - 1).astype(int)
+        weights = np.bincount(bucket, weights=self.weights)
+        sums = np.bincount(bucket, weights=self.values * self.weights)
+        keep = weights > 0
+        self.values = sums[keep] / weights[keep]
+        self.weights = weights[keep]
+
+    def quantile(self, q):
+        if not len(self.values):
+            return np.nan
+        cumulative = np.cumsum(self.weights)
+        position = (cumulative[-1] - 1) * q
+
+        def value_at(rank):
+            return self.values[min(np.searchsorted(cumulative, rank, side="right"), len(self.values) - 1)]
+
+        lower = np.floor(position)
+        return value_at(lower) + (value_at(lower + 1) - value_at(lower)) * (position - lower) if position > lower else value_at(lower)
+
+
+class ModeCounter:
+    """Mergeable value counts for most-frequent imputation, with SimpleImputer's tie-break on the smallest value.
+
+    Counts are kept for at most max_values distinct values (Misra-Gries style trimming), so an
+    identifier column cannot grow it without bound; the mode stays exact for any value that is
+    more frequent than 1/max_values of the rows.
+    """
+
+    def __init__(self, max_values=100000):
+        self.max_values = max_values
+        self.merged = pd.Series(dtype="float64")
+        # Per-chunk counts are buffered and merged in one groupby; aligning on every chunk is quadratic for id columns
+        self.pending = []
+        self.pending_size = 0
+
+    def update(self, values):
+        return self.merge_counts(pd.Series(values).dropna().astype(str).value_counts())
+
+    def merge_counts(self, counts):
+        self.pending.append(counts)
+        self.pending_size += len(counts)
+        if self.pending_size > self.max_values:
+            self.flush()
+        return self
+
+    def flush(self):
+        if self.pending:
+            parts = [counts for counts in [self.merged] + self.pending if not counts.empty]
+            if parts:
+                self.merged = pd.concat(parts).groupby(level=0).sum()
+            self.pending, self.pending_size = [], 0
+            if len(self.merged) > self.max_values:
+                threshold = self.merged.nlargest(self.max_values + 1).iloc[-1]
+                self.merged = self.merged[self.merged > threshold] - threshold
+
+    @property
+    def counts(self):
+        self.flush()
+        return self.merged
+
+    def merge(self, other):
+        return self.merge_counts(other.counts)
+
+    def mode(self):
+        counts = self.counts
+        if counts.empty:
+            return np.nan
+        top = counts[counts == counts.max()]
+        return sorted(top.index)[0]
+
+
+class RowDeduplicator:
+    """drop_duplicates across chunks: keeps a sorted array of 64-bit row hashes (8 bytes per distinct row)."""
+
+    def __init__(self):
+        self.seen = np.empty(0, dtype="uint64")
+
+    def filter(self, chunk):
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        first_in_chunk = ~pd.Series(hashes).duplicated().to_numpy()
+        position = np.searchsorted(self.seen, hashes)
+        seen_before = (position < len(self.seen)) & (self.seen[np.minimum(position, len(self.seen) - 1)] == hashes) if len(self.seen) else np.zeros(len(hashes), dtype=bool)
+        keep = first_in_chunk & ~seen_before
+        new = np.sort(hashes[keep])
+        self.seen = np.insert(self.seen, np.searchsorted(self.seen, new), new)
+        return chunk[keep]
+
+
+class ParquetChunkWriter:
+    """Appends conformed chunks to one Parquet file, one row group per chunk."""
+
+    def __init__(self, path, kinds):
+        self.path = path
+        self.kinds = kinds
+        self.writer = None
+        self.rows = 0
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(conform(chunk, self.kinds), schema=self.schema(chunk), preserve_index=False)
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+        self.rows += len(chunk)
+
+    def schema(self, chunk):
+        import pyarrow as pa
+        types = {"int": pa.int64(), "float": pa.float64(), "null": pa.float64(), "bool": pa.bool_(), "datetime": pa.timestamp("ns"), "string": pa.string()}
+        return pa.schema([(column, types[self.kinds[column]]) for column in chunk.columns])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        return self.rows
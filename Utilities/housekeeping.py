@@ -0,0 +1,194 @@
+import os
+import re
+import sys
+import glob
+import logging
+import argparse
+from datetime import datetime, timedelta
+sys.path.append(os.path.abspath("./Configurations"))
+sys.path.append(os.path.abspath("./Utilities"))
+import housekeepingConfig as config
+from instrumentation import init_stage, track
+from pipelineLogging import setup_logging
+from stageCache import get_connection, file_digest
+
+hourly_name = re.compile(r"^(?P<prefix>.+)_(?P<stamp>\d{14})\.(csv|parquet)$")
+daily_name = re.compile(r"^(?P<prefix>.+)_daily_(?P<stamp>\d{8})\.parquet$")
+monthly_name = re.compile(r"^(?P<prefix>.+)_monthly_(?P<stamp>\d{6})\.parquet$")
+any_stamp = re.compile(r"_(\d{14})(?!\d)")
+
+
+class Report:
+    def __init__(self):
+        self.files_removed = 0
+        self.files_created = 0
+        self.bytes_reclaimed = 0
+
+    def remove(self, path, dry_run):
+        self.files_removed += 1
+        self.bytes_reclaimed += os.path.getsize(path)
+        if not dry_run:
+            os.remove(path)
+
+    def as_dict(self):
+        return {"files_removed": self.files_removed, "files_created": self.files_created, "bytes_reclaimed": self.bytes_reclaimed}
+
+
+def parse_file(path):
+    """Returns (prefix, granularity, timestamp) for a data file, or None for files housekeeping leaves alone."""
+    name = os.path.basename(path)
+    for granularity, pattern, fmt in [("hourly", hourly_name, "%Y%m%d%H%M%S"), ("daily", daily_name, "%Y%m%d"), ("monthly", monthly_name, "%Y%m")]:
+        match = pattern.match(name)
+        if match:
+            return match.group("prefix"), granularity, datetime.strptime(match.group("stamp"), fmt)
+    return None
+
+
+def file_timestamp(path):
+    parsed = parse_file(path)
+    if parsed:
+        return parsed[2]
+    # Stage logs, metrics and profiles carry the run timestamp somewhere in their name
+    match = any_stamp.search(os.path.basename(path))
+    return datetime.strptime(match.group(1), "%Y%m%d%H%M%S") if match else datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def last_written(path):
+    # A long-running process (the scoring service) keeps appending to a log named after its start
+    # time, so age it by whichever of the name timestamp and mtime is newer
+    return max(file_timestamp(path), datetime.fromtimestamp(os.path.getmtime(path)))
+
+
+def data_files(directory_path):
+    return glob.glob(os.path.join(directory_path, "*.csv")) + glob.glob(os.path.join(directory_path, "*.parquet"))
+
+
+def deduplicate(directory_path, report, dry_run=False, connection=None):
+    """Deletes files whose content is byte-identical to an older file in the same directory.
+
+    With a stage cache connection, digests of files unchanged since the last run (same size and
+    mtime) come from its file_digests table instead of being re-read.
+    """
+    seen, removed = {}, []
+    for path in sorted(data_files(directory_path), key=file_timestamp):
+        digest = file_digest(path, connection)
+        if digest in seen:
+            logging.info(f"{path} is identical to {seen[digest]}, removing it")
+            report.remove(path, dry_run)
+            removed.append(path)
+        else:
+            seen[digest] = path
+    return removed
+
+
+def write_partition(sources, output_path):
+    """Concatenates sources into one Parquet file chunk by chunk, with one schema across all of them."""
+    from chunkedProcessing import iter_file_chunks, column_kind, merge_kind, ParquetChunkWriter
+    columns, kinds, file_columns = [], {}, {}
+    for path in sources:
+        file_columns[path] = set()
+        for chunk in iter_file_chunks(path, 100000):
+            file_columns[path].update(chunk.columns)
+            for col in chunk.columns:
+                if col not in kinds:
+                    columns.append(col)
+                kinds[col] = merge_kind(kinds.get(col), column_kind(chunk[col]))
+    # A column missing from some files is null there, as pd.concat would make it
+    for path in sources:
+        for col in set(columns) - file_columns[path]:
+            kinds[col] = merge_kind(kinds[col], "null")
+    temp_path = output_path + ".tmp"
+    writer = ParquetChunkWriter(temp_path, kinds)
+    for path in sources:
+        for chunk in iter_file_chunks(path, 100000):
+            writer.write(chunk.reindex(columns=columns))
+    rows = writer.close()
+    # Readers glob *.parquet, so the partition only becomes visible once it is complete
+    os.replace(temp_path, output_path)
+    return rows
+
+
+def compact(directory_path, report, now, dry_run=False, skip=()):
+    """Merges hourly files older than daily_after_days into <prefix>_daily_<YYYYMMDD>.parquet, and
+    files of months that ended more than monthly_after_days ago into <prefix>_monthly_<YYYYMM>.parquet."""
+    groups = {}
+    for path in data_files(directory_path):
+        parsed = parse_file(path)
+        if parsed is None or path in skip:
+            continue
+        prefix, granularity, stamp = parsed
+        month_end = (stamp.replace(day=1) + timedelta(days=32)).replace(day=1)
+        if (now - month_end).days >= config.monthly_after_days:
+            key = (prefix, "monthly", stamp.strftime("%Y%m"))
+        elif granularity == "hourly" and (now.date() - stamp.date()).days >= config.daily_after_days:
+            key = (prefix, "daily", stamp.strftime("%Y%m%d"))
+        else:
+            continue
+        groups.setdefault(key, []).append(path)
+
+    for (prefix, granularity, stamp), sources in sorted(groups.items()):
+        output_path = os.path.join(directory_path, f"{prefix}_{granularity}_{stamp}.parquet")
+        # An existing partition is rewritten together with any files that arrived for its period since
+        sources = sorted(sources, key=file_timestamp)
+        merged = [path for path in sources if path != output_path]
+        if not merged:
+            continue
+        if dry_run:
+            logging.info(f"Would compact {len(sources)} files into {output_path}")
+            report.files_removed += len(merged)
+            continue
+        bytes_before = sum(os.path.getsize(path) for path in sources)
+        with track("compact", partition=output_path) as step:
+            step.rows_out = write_partition(sources, output_path)
+        report.bytes_reclaimed += bytes_before - os.path.getsize(output_path)
+        report.files_created += len(merged) == len(sources)
+        for path in merged:
+            os.remove(path)
+        report.files_removed += len(merged)
+        logging.info(f"Compacted {len(sources)} files into {output_path} ({step.rows_out} rows)")
+
+
+def apply_retention(report, now, dry_run=False):
+    for pattern, days in config.retention.items():
+        for path in glob.glob(pattern):
+            if os.path.isfile(path) and now - last_written(path) > timedelta(days=days):
+                logging.info(f"{path} is older than {days} days, removing it")
+                report.remove(path, dry_run)
+
+
+def run_housekeeping(dry_run=False, now=None):
+    now = now or datetime.now()
+    report = Report()
+    connection = get_connection()
+    with track("housekeeping", dry_run=dry_run) as step:
+        for directory_path in config.data_dirs:
+            if not os.path.isdir(directory_path):
+                continue
+            duplicates = deduplicate(directory_path, report, dry_run, connection)
+            connection.commit()
+            compact(directory_path, report, now, dry_run, skip=duplicates)
+        apply_retention(report, now, dry_run)
+        if not dry_run:
+            # Files deduplicated or compacted away would otherwise keep their digest rows forever
+            with connection:
+                stale = [row["path"] for row in connection.execute("SELECT path FROM file_digests") if not os.path.exists(row["path"])]
+                connection.executemany("DELETE FROM file_digests WHERE path = ?", [(path,) for path in stale])
+        step.extra.update(report.as_dict())
+    connection.close()
+    logging.info(f"Housekeeping {'would reclaim' if dry_run else 'reclaimed'} {report.bytes_reclaimed / 2**20:.1f} MiB: "
+                 f"{report.files_removed} files removed, {report.files_created} partitions written")
+    return report.as_dict()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate and compact staging files and apply log/report retention")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be removed without touching any file; compaction savings are only known once written")
+    args = parser.parse_args()
+
+    if hasattr(os, "nice"):
+        os.nice(config.niceness)
+    setup_logging("housekeeping")
+    init_stage("housekeeping")
+    result = run_housekeeping(dry_run=args.dry_run)
+    print(f"{'Would reclaim' if args.dry_run else 'Reclaimed'} {result['bytes_reclaimed']} bytes: "
+          f"{result['files_removed']} files removed, {result['files_created']} partitions written")
@@ -0,0 +1,281 @@
+import os
+import sys
+import glob
+import json
+import time
+import atexit
+import logging
+import functools
+import threading
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Stages run as separate processes; the DAG exports PIPELINE_RUN_ID so they share one metrics file.
+# run_id is only the fallback for processes started outside a flow run
+run_id = os.environ.get("PIPELINE_RUN_ID", datetime.now().strftime("%Y%m%d%H%M%S"))
+metrics_dir = "logs"
+stage_name = os.path.splitext(os.path.basename(sys.argv[0]))[0] or "interactive"
+# Steps currently inside a track block; each one keeps the highest RSS sampled while it is open
+open_steps = []
+rss_sample_interval = float(os.environ.get("RSS_SAMPLE_INTERVAL", "0.01"))
+rss_sampler = None
+
+
+def current_run_id():
+    # Read on every record: the DAG process imports this module before a flow run sets PIPELINE_RUN_ID,
+    # and a served flow sets a new one for each run
+    return os.environ.get("PIPELINE_RUN_ID", run_id)
+
+
+def metrics_file(run=None):
+    return os.path.join(metrics_dir, f"metrics_{run or current_run_id()}.jsonl")
+
+
+def latest_run():
+    all_files = glob.glob(os.path.join(metrics_dir, "metrics_*.jsonl"))
+    if not all_files:
+        return None
+    return os.path.basename(max(all_files, key=os.path.getmtime))[len("metrics_"):-len(".jsonl")]
+
+
+def process_peak_rss_bytes():
+    """High-water mark of the whole process so far; it only ever increases, so it is not a per-step figure."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def sample_rss():
+    rss = current_rss_bytes()
+    if rss is not None:
+        for step in list(open_steps):
+            step.peak_rss = max(step.peak_rss or 0, rss)
+
+
+def sample_rss_forever():
+    while True:
+        time.sleep(rss_sample_interval)
+        if open_steps:
+            sample_rss()
+
+
+def start_rss_sampler():
+    """Starts the daemon thread that samples RSS while any step is open.
+
+    ru_maxrss only ever grows, so it cannot give one step's peak; resetting it through
+    /proc/self/clear_refs would also reset the value a parent reads with wait4. Allocations
+    that live shorter than the sampling interval can be missed.
+    """
+    global rss_sampler
+    if rss_sampler is None and current_rss_bytes() is not None:
+        rss_sampler = threading.Thread(target=sample_rss_forever, name="rss-sampler", daemon=True)
+        rss_sampler.start()
+
+
+def io_counters():
+    try:
+        with open("/proc/self/io") as f:
+            counters = dict(line.split(":") for line in f.read().splitlines())
+        return int(counters["rchar"]), int(counters["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def count_rows(value):
+    if hasattr(value, "shape") and len(getattr(value, "shape", ())) > 0:
+        return int(value.shape[0])
+    return None
+
+
+def emit(record):
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        with open(metrics_file(), "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError as e:
+        logging.error(f"Error in writing metrics: {e}")
+
+
+class track:
+    """Context manager recording wall/CPU time, peak RSS, rows and I/O bytes for one step.
+
+    Rows are set by the caller (step.rows_in / step.rows_out); the record is written as a
+    JSON line to logs/metrics_<run_id>.jsonl when the block exits. peak_rss_bytes is the highest
+    RSS sampled while the step ran (None without /proc); process_peak_rss_bytes is the
+    process-wide high-water mark at exit, which never decreases.
+    """
+
+    def __init__(self, step, rows_in=None, **extra):
+        self.step = step
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.extra = extra
+
+    def __enter__(self):
+        start_rss_sampler()
+        self.peak_rss = None
+        # Steps inside another step are already part of its time, and summary totals skip them
+        self.depth = len(open_steps)
+        open_steps.append(self)
+        sample_rss()
+        self.started_at = datetime.now()
+        self.read_start, self.write_start = io_counters()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        read_end, write_end = io_counters()
+        sample_rss()
+        open_steps.remove(self)
+        record = {
+            "run_id": current_run_id(),
+            "stage": stage_name,
+            "step": self.step,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(cpu, 6),
+            "peak_rss_bytes": self.peak_rss,
+            "process_peak_rss_bytes": process_peak_rss_bytes(),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_read": None if read_end is None else read_end - self.read_start,
+            "bytes_written": None if write_end is None else write_end - self.write_start,
+            "status": "error" if exc_type else "ok",
+            "depth": self.depth,
+        }
+        record.update(self.extra)
+        emit(record)
+        return False
+
+
+def instrument(step=None):
+    """Decorator form of track; rows come from the first array-like argument and the return value."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows_in = next((count_rows(arg) for arg in list(args) + list(kwargs.values()) if count_rows(arg) is not None), None)
+            with track(step or func.__name__, rows_in) as tracked:
+                result = func(*args, **kwargs)
+                tracked.rows_out = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def profiling_enabled(stage):
+    stages = os.environ.get("PROFILE_STAGES", "")
+    return stages == "all" or stage in [s.strip() for s in stages.split(",")]
+
+
+def init_stage(stage):
+    """Names the stage for its metrics and starts the opt-in profiler.
+
+    Set PROFILE_STAGES=all (or a comma-separated list of stage names) to dump a profile to
+    logs/profile_<stage>_<run_id>; PROFILER=pyinstrument switches from cProfile to pyinstrument.
+    """
+    global stage_name
+    stage_name = stage
+    if not profiling_enabled(stage):
+        return None
+    os.makedirs(metrics_dir, exist_ok=True)
+    output = os.path.join(metrics_dir, f"profile_{stage}_{current_run_id()}")
+    if os.environ.get("PROFILER", "cprofile") == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+
+        def dump():
+            profiler.stop()
+            with open(f"{output}.html", "w") as f:
+                f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(f"{output}.prof")
+    # Stage scripts do their work at module level, so the profile is written when the process exits
+    atexit.register(dump)
+    logging.info(f"Profiling stage {stage} to {output}")
+    return profiler
+
+
+def load_metrics(run=None):
+    path = metrics_file(run)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summary_table(records):
+    header = f"{'stage':<22} {'step':<28} {'calls':>5} {'wall s':>9} {'cpu s':>9} {'peak RSS MiB':>13} {'rows in':>10} {'rows out':>10} {'MiB read':>9} {'MiB written':>11}"
+    lines = [header, "-" * len(header)]
+    grouped = {}
+    for record in records:
+        grouped.setdefault((record["stage"], record["step"]), []).append(record)
+
+    def total(items, key):
+        values = [item[key] for item in items if item.get(key) is not None]
+        return sum(values) if values else None
+
+    def fmt(value, scale=1, digits=0):
+        return "-" if value is None else f"{value / scale:.{digits}f}"
+
+    for (stage, step), items in grouped.items():
+        peaks = [item.get("peak_rss_bytes") or item.get("process_peak_rss_bytes") for item in items]
+        peak = max((value for value in peaks if value is not None), default=None)
+        lines.append(
+            f"{stage:<22} {step:<28} {len(items):>5} {total(items, 'wall_seconds'):>9.3f} {total(items, 'cpu_seconds'):>9.3f} "
+            f"{fmt(peak, 2**20, 1):>13} {fmt(total(items, 'rows_in')):>10} {fmt(total(items, 'rows_out')):>10} "
+            f"{fmt(total(items, 'bytes_read'), 2**20, 1):>9} {fmt(total(items, 'bytes_written'), 2**20, 1):>11}"
+        )
+    # Totals count only outermost steps. A stage_cache record that ran the stage (miss or
+    # uncacheable) times the whole subprocess in wall time, so that stage's own records are left
+    # out of the wall total; its CPU time is the DAG process's alone, so CPU still counts them.
+    outermost = [record for record in records if not record.get("depth")]
+    ran = {record["stage"] for record in outermost if record["step"] == "stage_cache" and record.get("cache") != "hit"}
+    wall = sum(record["wall_seconds"] for record in outermost if record["step"] == "stage_cache" or record["stage"] not in ran)
+    cpu = sum(record["cpu_seconds"] for record in outermost)
+    lines.append(f"{'total':<22} {'':<28} {len(records):>5} {wall:>9.3f} {cpu:>9.3f}")
+    cached = [record for record in records if record.get("cache")]
+    if cached:
+        hits = [record for record in cached if record["cache"] == "hit"]
+        lines.append(f"stage cache: {len(hits)}/{len(cached)} stages restored ({', '.join(record['stage'] for record in hits) or 'none'}), "
+                     f"{sum(record.get('saved_seconds') or 0 for record in hits):.1f}s saved")
+    return "\n".join(lines)
+
+
+def write_summary(run=None):
+    records = load_metrics(run)
+    table = summary_table(records)
+    with open(os.path.join(metrics_dir, f"run_summary_{run or current_run_id()}.txt"), "w") as f:
+        f.write(table + "\n")
+    return table
+
+
+if __name__ == "__main__":
+    run = sys.argv[1] if len(sys.argv) > 1 else latest_run()
+    if run is None:
+        print(f"No metrics found in {metrics_dir}")
+    else:
+        print(write_summary(run))
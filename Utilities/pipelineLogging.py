@@ -0,0 +1,112 @@
+import os
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+
+# Stages share the DAG's PIPELINE_RUN_ID, so a run's logs are the logs/pipeline_<run_id>_*.log files.
+# Each process writes its own file: processes rolling over one shared file can lose records once
+# stages run in parallel
+run_id = os.environ.get("PIPELINE_RUN_ID", datetime.now().strftime("%Y%m%d%H%M%S"))
+log_dir = "logs"
+max_bytes = int(os.environ.get("LOG_MAX_BYTES", 10 * 2**20))
+backup_count = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
+log_format = '%(asctime)s:%(levelname)s:%(stage)s:%(message)s'
+listener = None
+stage_filter = None
+
+
+class StageFilter(logging.Filter):
+    """Stamps each record with the stage that logged it, so one run log can hold every stage."""
+
+    def __init__(self, stage):
+        super().__init__()
+        self.stage = stage
+
+    def filter(self, record):
+        if not hasattr(record, "stage"):
+            record.stage = self.stage
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves %-formatting to the listener thread when that is safe.
+
+    The stock prepare() formats and copies every record on the calling thread. Records whose
+    arguments are immutable scalars can be formatted later without changing the message, so they
+    are queued as they are; anything else (frames, previews, exceptions) is rendered now, as a
+    snapshot.
+    """
+
+    immutable_types = (str, int, float, bool, type(None))
+
+    def prepare(self, record):
+        args = record.args
+        if record.exc_info is None and record.stack_info is None and isinstance(args, tuple) and all(isinstance(arg, self.immutable_types) for arg in args):
+            return record
+        return super().prepare(record)
+
+
+class FramePreview:
+    """Size-bounded stand-in for a DataFrame in a log call.
+
+    Pass it as a %s argument: the frame is only rendered when the record is emitted, and then
+    only the first max_rows rows, cut to max_chars characters.
+    """
+
+    def __init__(self, df, max_rows=10, max_chars=2000):
+        self.df = df
+        self.max_rows = max_rows
+        self.max_chars = max_chars
+
+    def __str__(self):
+        text = self.df.head(self.max_rows).to_string()
+        if len(self.df) > self.max_rows:
+            text += f"\n... {len(self.df) - self.max_rows} more rows"
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars] + f"... ({len(text) - self.max_chars} more characters)"
+        return text
+
+
+def setup_logging(stage, level=logging.INFO, log_file=None):
+    """Routes the root logger through a QueueHandler to a QueueListener thread that owns the file handler.
+
+    Callers only pay for putting the record on the queue; the file write happens on the
+    listener thread. Logs go to logs/pipeline_<run_id>_<stage>_<pid>.log unless log_file is given,
+    rotating at LOG_MAX_BYTES with LOG_BACKUP_COUNT backups. Calling it again in the same process
+    only switches the stage name.
+    """
+    global listener, stage_filter
+    if listener is not None:
+        stage_filter.stage = stage
+        return listener
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = log_file or os.path.join(log_dir, f"pipeline_{run_id}_{stage}_{os.getpid()}.log")
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(logging.Formatter(log_format))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    stage_filter = StageFilter(stage)
+    queue_handler.addFilter(stage_filter)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    # Stage scripts end by falling off the module, so drain the queue at interpreter exit
+    atexit.register(stop_logging)
+    return listener
+
+
+def stop_logging():
+    global listener
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        listener = None
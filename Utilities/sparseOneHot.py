@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+id_columns = ("customerid", "customer_ids", "event_timestamp")
+other_category = "__other__"
+
+
+def stable_hash(values, n_buckets):
+    # Python's hash() is salted per process; pandas' hash_array uses a fixed key, so buckets
+    # are the same at training and scoring time
+    return (pd.util.hash_array(values.astype(str).to_numpy(dtype=object)) % n_buckets).astype(np.int64)
+
+
+class SparseOneHot:
+    """One-hot encodes categorical columns into a CSR matrix with a frozen vocabulary.
+
+    Identifier columns are skipped. Each column keeps its max_categories most frequent
+    values plus an "other" slot for rare, unseen and missing values; columns with more
+    than hash_threshold distinct values are hashed into n_hash_buckets instead. It needs only
+    pandas and scipy.sparse; categoricalEncoder.CategoricalEncoder is the sklearn estimator form.
+    """
+
+    def __init__(self, columns=None, exclude=id_columns, max_categories=50, hash_threshold=1000, n_hash_buckets=64):
+        self.columns = columns
+        self.exclude = exclude
+        self.max_categories = max_categories
+        self.hash_threshold = hash_threshold
+        self.n_hash_buckets = n_hash_buckets
+
+    def fit(self, X, y=None):
+        X = pd.DataFrame(X)
+        if self.columns is None:
+            columns = X.select_dtypes(include=["object", "category", "string"]).columns
+        else:
+            columns = self.columns
+        self.columns_ = [col for col in columns if col not in set(self.exclude or ())]
+        self.vocabularies_ = {}
+        self.hashed_columns_ = []
+        for col in self.columns_:
+            counts = X[col].value_counts(dropna=True)
+            if len(counts) > self.hash_threshold:
+                self.hashed_columns_.append(col)
+            else:
+                self.vocabularies_[col] = pd.Index(counts.index[:self.max_categories].astype(str)).unique()
+        self.offsets_ = {}
+        offset = 0
+        for col in self.columns_:
+            self.offsets_[col] = offset
+            offset += self.n_hash_buckets if col in self.hashed_columns_ else len(self.vocabularies_[col]) + 1
+        self.n_features_out_ = offset
+        return self
+
+    def column_codes(self, col, values):
+        if col in self.hashed_columns_:
+            return stable_hash(values, self.n_hash_buckets)
+        vocabulary = self.vocabularies_[col]
+        codes = vocabulary.get_indexer(values.astype(str).where(values.notna(), None))
+        # Unknown and missing values share the trailing "other" slot
+        codes[codes < 0] = len(vocabulary)
+        return codes
+
+    def transform(self, X):
+        X = pd.DataFrame(X)
+        n_rows = len(X)
+        if not self.columns_:
+            return sparse.csr_matrix((n_rows, 0))
+        indices = np.empty(n_rows * len(self.columns_), dtype=np.int64)
+        for position, col in enumerate(self.columns_):
+            indices[position::len(self.columns_)] = self.offsets_[col] + self.column_codes(col, X[col])
+        indptr = np.arange(0, n_rows * len(self.columns_) + 1, len(self.columns_), dtype=np.int64)
+        data = np.ones(len(indices), dtype=np.float64)
+        return sparse.csr_matrix((data, indices, indptr), shape=(n_rows, self.n_features_out_))
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X, y).transform(X)
+
+    def get_feature_names_out(self, input_features=None):
+        names = []
+        for col in self.columns_:
+            if col in self.hashed_columns_:
+                names.extend(f"{col}_hash{bucket}" for bucket in range(self.n_hash_buckets))
+            else:
+                names.extend(f"{col}_{value}" for value in self.vocabularies_[col])
+                names.append(f"{col}_{other_category}")
+        return np.asarray(names, dtype=object)
@@ -0,0 +1,179 @@
+import os
+import sys
+import glob
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import subprocess
+from datetime import date, datetime
+sys.path.append(os.path.abspath("./Utilities"))
+from instrumentation import track
+
+cache_dir = "Cache"
+cache_db = os.path.join(cache_dir, "index.db")
+max_cache_bytes = int(os.environ.get("STAGE_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+shared_code = ["Configurations/*.py", "Utilities/*.py"]
+
+
+def get_connection():
+    os.makedirs(cache_dir, exist_ok=True)
+    connection = sqlite3.connect(cache_db)
+    connection.row_factory = sqlite3.Row
+    connection.execute("""CREATE TABLE IF NOT EXISTS entries (
+        fingerprint TEXT PRIMARY KEY,
+        stage TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        last_used REAL NOT NULL,
+        seconds REAL NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0)""")
+    connection.execute("""CREATE TABLE IF NOT EXISTS file_digests (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        digest TEXT NOT NULL)""")
+    return connection
+
+
+def file_digest(path, connection=None):
+    """SHA-256 of a file's content, memoised on (size, mtime) so unchanged inputs are not re-read."""
+    stat = os.stat(path)
+    if connection is not None:
+        row = connection.execute("SELECT digest FROM file_digests WHERE path = ? AND size = ? AND mtime_ns = ?",
+                                 (path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        if row is not None:
+            return row["digest"]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    digest = digest.hexdigest()
+    if connection is not None:
+        connection.execute("INSERT OR REPLACE INTO file_digests (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                           (path, stat.st_size, stat.st_mtime_ns, digest))
+    return digest
+
+
+def expand(patterns):
+    return sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)})
+
+
+def table_watermark(table):
+    """Row count and latest ingestion date of a table, or None when the database is unreachable."""
+    try:
+        sys.path.append(os.path.abspath("./Configurations"))
+        import dbConfig as db
+        import psycopg2
+        connection = psycopg2.connect(**db.DB_PARAMS)
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT count(*), max(ingestiondate) FROM {table}")
+        count, latest = cursor.fetchone()
+        cursor.close()
+        connection.close()
+        # rawDataStorage exports CURRENT_DATE rows, so the same table state on a new day is new input
+        return f"{table}:{count}:{latest}:{date.today()}"
+    except Exception as e:
+        logging.warning(f"Could not read watermark for {table}: {e}")
+        return None
+
+
+def fingerprint(stage, inputs=(), code=(), config=None, watermark=None, connection=None):
+    digest = hashlib.sha256(stage.encode())
+    # Input files count by content only, so a byte-identical copy under a new timestamped name
+    # still changes the fingerprint (the stage would read it twice) but a rename does not
+    for file_hash in sorted(file_digest(path, connection) for path in expand(inputs)):
+        digest.update(b"in:" + file_hash.encode())
+    for path in expand(list(code) + shared_code):
+        digest.update(f"code:{path}:{file_digest(path, connection)}".encode())
+    for key, value in sorted((config or {}).items()):
+        digest.update(f"config:{key}={value}".encode())
+    if watermark is not None:
+        digest.update(f"watermark:{watermark}".encode())
+    return digest.hexdigest()
+
+
+def snapshot(patterns):
+    return {path: (os.stat(path).st_size, os.stat(path).st_mtime_ns) for path in expand(patterns)}
+
+
+def store(connection, key, stage, files, seconds):
+    entry_dir = os.path.join(cache_dir, key)
+    size_bytes = 0
+    for path in files:
+        target = os.path.join(entry_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(path, target)
+        size_bytes += os.path.getsize(target)
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (fingerprint, stage, created_at, last_used, seconds, size_bytes) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, stage, datetime.now().isoformat(), time.time(), seconds, size_bytes),
+        )
+    return size_bytes
+
+
+def restore(connection, entry):
+    entry_dir = os.path.join(cache_dir, entry["fingerprint"])
+    restored = 0
+    for cached in expand([os.path.join(entry_dir, "**", "*")]):
+        target = os.path.relpath(cached, entry_dir)
+        # Outputs from the previous run are usually still in place; only copy back what is missing or changed
+        if not os.path.exists(target) or file_digest(target, connection) != file_digest(cached, connection):
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            shutil.copy2(cached, target)
+            restored += 1
+    with connection:
+        connection.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE fingerprint = ?", (time.time(), entry["fingerprint"]))
+    return restored
+
+
+def evict(connection, max_bytes=max_cache_bytes):
+    """Drops least recently used entries until the cache fits in max_bytes."""
+    entries = connection.execute("SELECT fingerprint, size_bytes FROM entries ORDER BY last_used DESC").fetchall()
+    total = 0
+    evicted = 0
+    for entry in entries:
+        total += entry["size_bytes"]
+        if total > max_bytes:
+            shutil.rmtree(os.path.join(cache_dir, entry["fingerprint"]), ignore_errors=True)
+            with connection:
+                connection.execute("DELETE FROM entries WHERE fingerprint = ?", (entry["fingerprint"],))
+            evicted += 1
+    if evicted:
+        logging.info(f"Stage cache evicted {evicted} entries to stay under {max_bytes} bytes")
+    return evicted
+
+
+def run_cached(stage, command, inputs=(), outputs=(), code=(), config=None, watermark_table=None):
+    """Runs a stage command unless an earlier run saw the same inputs, config, code and DB watermark.
+
+    A stage with a watermark_table whose database cannot be reached is always run.
+    """
+    connection = get_connection()
+    watermark = table_watermark(watermark_table) if watermark_table else None
+    cacheable = watermark_table is None or watermark is not None
+    key = fingerprint(stage, inputs, code, config, watermark, connection) if cacheable else None
+    connection.commit()
+    entry = connection.execute("SELECT * FROM entries WHERE fingerprint = ?", (key,)).fetchone() if key else None
+    if entry is not None:
+        with track("stage_cache", stage=stage, cache="hit", saved_seconds=entry["seconds"]):
+            restored = restore(connection, entry)
+        logging.info(f"Stage cache hit for {stage} ({key[:12]}), restored {restored} files, saved {entry['seconds']:.1f}s")
+        connection.close()
+        return {"stage": stage, "cache": "hit", "returncode": 0, "saved_seconds": entry["seconds"]}
+
+    before = snapshot(outputs)
+    start = time.perf_counter()
+    with track("stage_cache", stage=stage, cache="miss" if cacheable else "uncacheable", saved_seconds=0):
+        result = subprocess.run(command)
+    seconds = time.perf_counter() - start
+    if cacheable and result.returncode == 0:
+        after = snapshot(outputs)
+        changed = [path for path, stat in after.items() if before.get(path) != stat]
+        size_bytes = store(connection, key, stage, changed, seconds)
+        logging.info(f"Stage cache miss for {stage} ({key[:12]}), stored {len(changed)} files ({size_bytes} bytes)")
+        evict(connection)
+    connection.close()
+    return {"stage": stage, "cache": "miss" if cacheable else "uncacheable", "returncode": result.returncode, "saved_seconds": 0}